@@ -2,11 +2,13 @@
 Code analysis modules for PR Agent
 """
 
-from .base import Analyzer, AnalysisResult, Issue
+from .base import Analyzer, AnalysisContext, AnalysisResult, Issue
 from .quality import QualityAnalyzer
 from .security import SecurityAnalyzer
 from .style import StyleAnalyzer
+from .typecheck import TypeCheckAnalyzer
+from .custom import CustomRuleAnalyzer
 from .ai import AIAnalyzer
 
-__all__ = ["Analyzer", "AnalysisResult", "Issue", "QualityAnalyzer", "SecurityAnalyzer", "StyleAnalyzer", "AIAnalyzer"]
+__all__ = ["Analyzer", "AnalysisContext", "AnalysisResult", "Issue", "QualityAnalyzer", "SecurityAnalyzer", "StyleAnalyzer", "TypeCheckAnalyzer", "CustomRuleAnalyzer", "AIAnalyzer"]
 
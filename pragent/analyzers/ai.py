@@ -6,12 +6,14 @@ import asyncio
 import json
 from typing import List, Dict, Any, Optional
 
-from .base import Analyzer, AnalysisResult, Issue, IssueSeverity, IssueType
+from .base import Analyzer, AnalysisContext, AnalysisResult, Issue, IssueSeverity, IssueType
 
 
 class AIAnalyzer(Analyzer):
     """AI-powered analyzer for advanced code analysis"""
     
+    stage = 'ai'
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.enabled = config.get('enabled', False)
@@ -26,7 +28,8 @@ class AIAnalyzer(Analyzer):
         self.enable_security = config.get('enable_security_analysis', True)
         self.enable_readability = config.get('enable_readability_improvements', True)
     
-    async def analyze(self, file_path: str, content: str) -> AnalysisResult:
+    async def analyze(self, file_path: str, content: str,
+                      context: Optional[AnalysisContext] = None) -> AnalysisResult:
         """Analyze code using AI"""
         if not self.enabled or not self.api_key:
             return AnalysisResult(
@@ -39,6 +42,7 @@ class AIAnalyzer(Analyzer):
         
         issues = []
         metrics = {}
+        complete = True
         
         try:
             # Generate AI analysis
@@ -62,13 +66,15 @@ class AIAnalyzer(Analyzer):
             metrics = {'ai_error': str(e)}
             score = 100.0
             summary = f"AI analysis failed: {e}"
+            complete = False
         
         return AnalysisResult(
             file_path=file_path,
             issues=issues,
             metrics=metrics,
             score=score,
-            summary=summary
+            summary=summary,
+            complete=complete
         )
     
     async def _analyze_with_ai(self, file_path: str, content: str) -> str:
@@ -0,0 +1,100 @@
+"""
+Single-traversal scanner for AST node rules
+"""
+
+import ast
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Sequence, Tuple, Container, Callable
+
+from .base import IssueSeverity, IssueType
+
+
+@dataclass(frozen=True)
+class NodeRule:
+    """A predicate that flags the line of every matching node of the given types"""
+    rule_id: str
+    node_types: Tuple[type, ...]
+    predicate: Callable[[ast.AST], bool]
+    message: str
+    severity: IssueSeverity
+    issue_type: IssueType
+    suggestion: str
+    callees: Tuple[str, ...] = ()  # for ast.Call rules: only calls to these function or method names
+
+
+def callee_name(node: ast.Call) -> Optional[str]:
+    """Name of the function or method a call invokes (None for other callees)"""
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+class NodeScanner:
+    """Matches many node rules with one traversal of a module's AST
+
+    Rules are indexed by node type, and call rules also by callee name, so each
+    node only costs a dictionary lookup plus the predicates of the rules that
+    can apply to it. The traversal uses an explicit stack, so deeply nested
+    code can't exhaust the recursion limit.
+    """
+    
+    def __init__(self, rules: Sequence[NodeRule]):
+        self.rules = tuple(rules)
+        self._dispatch: Dict[type, List[Tuple[int, NodeRule]]] = {}
+        self._call_dispatch: Dict[str, List[Tuple[int, NodeRule]]] = {}
+        self._child_fields: Dict[type, Tuple[str, ...]] = {}
+        for index, rule in enumerate(self.rules):
+            if rule.callees:
+                for name in rule.callees:
+                    self._call_dispatch.setdefault(name, []).append((index, rule))
+            else:
+                for node_type in rule.node_types:
+                    self._dispatch.setdefault(node_type, []).append((index, rule))
+        
+        # Hits are ordered by rule group (consecutive rules sharing a rule_id), then line
+        self._groups = []
+        for index, rule in enumerate(self.rules):
+            if index and rule.rule_id == self.rules[index - 1].rule_id:
+                self._groups.append(self._groups[-1])
+            else:
+                self._groups.append(index)
+    
+    def scan(self, tree: ast.AST, line_filter: Optional[Container[int]] = None) -> List[Tuple[NodeRule, int]]:
+        """Return (rule, line_number) for every line a rule matches, grouped by rule"""
+        hits = set()
+        dispatch = self._dispatch
+        call_dispatch = self._call_dispatch
+        child_fields = self._child_fields
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            rules = dispatch.get(node_type)
+            if node_type is ast.Call and call_dispatch:
+                called = call_dispatch.get(callee_name(node))
+                if called:
+                    rules = rules + called if rules else called
+            
+            if rules:
+                line_number = node.lineno
+                if line_filter is None or line_number in line_filter:
+                    for index, rule in rules:
+                        if rule.predicate(node):
+                            hits.add((index, line_number))
+            
+            # Inlined ast.iter_child_nodes (which dominated the cost), skipping Load/Store contexts
+            fields = child_fields.get(node_type)
+            if fields is None:
+                fields = child_fields[node_type] = tuple(name for name in node._fields if name != 'ctx')
+            for name in fields:
+                child = getattr(node, name, None)
+                if isinstance(child, list):
+                    stack.extend(item for item in child if isinstance(item, ast.AST))
+                elif isinstance(child, ast.AST):
+                    stack.append(child)
+        
+        hits = sorted((self._groups[index], line_number, index) for index, line_number in hits)
+        return [(self.rules[index], line_number) for _, line_number, index in hits]
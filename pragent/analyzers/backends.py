@@ -0,0 +1,107 @@
+"""
+In-process backends for pylint, bandit, black and isort
+
+The functions here call each tool's Python API and return data shaped like the
+tool's JSON or formatted output, so analyzers parse both backends the same way. They
+are meant to run in a long-lived worker process (see create_tool_pool) where the
+heavy imports happen once.
+"""
+
+import os
+import tempfile
+from typing import List, Dict, Any, Optional
+
+from .workers import ToolWorkerPool
+
+
+def warm_up() -> None:
+    """Import the tools up front so the first job does not pay for it"""
+    for module in ('pylint.lint', 'bandit.core.manager', 'black', 'isort'):
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+
+def create_tool_pool(max_workers: Optional[int] = None, max_jobs_per_worker: Optional[int] = None,
+                     max_memory_bytes: Optional[int] = None,
+                     job_timeout: Optional[float] = None,
+                     cpu_limit: Optional[int] = None,
+                     memory_limit: Optional[int] = None) -> ToolWorkerPool:
+    """Create a pool of warm, self-recycling worker processes for in-process tool runs
+    
+    cpu_limit (seconds per job) and memory_limit (bytes of address space) bound the
+    workers the way set_tool_limits bounds tool subprocesses.
+    """
+    return ToolWorkerPool(
+        max_workers=max_workers,
+        initializer=warm_up,
+        max_jobs_per_worker=max_jobs_per_worker,
+        max_memory_bytes=max_memory_bytes,
+        job_timeout=job_timeout,
+        cpu_limit=cpu_limit,
+        memory_limit=memory_limit
+    )
+
+
+def _write_temp_file(content: str, workspace: Optional[str] = None) -> str:
+    """Write content to a temporary .py file (in the PR workspace if given) and return its path"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', dir=workspace, delete=False) as f:
+        f.write(content)
+        return f.name
+
+
+def pylint_messages(content: str, workspace: Optional[str] = None,
+                    options: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Lint content with pylint, returning messages shaped like --output-format=json"""
+    from pylint.lint import Run
+    from pylint.reporters import CollectingReporter
+    
+    temp_file = _write_temp_file(content, workspace)
+    try:
+        reporter = CollectingReporter()
+        Run([*(options or []), temp_file], reporter=reporter, exit=False)
+        return [
+            {
+                'type': message.category,
+                'line': message.line,
+                'column': message.column,
+                'message': message.msg,
+                'message-id': message.msg_id
+            }
+            for message in reporter.messages
+        ]
+    finally:
+        os.unlink(temp_file)
+
+
+def bandit_results(content: str, workspace: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Scan content with bandit's manager API, returning the JSON 'results' entries"""
+    from bandit.core import config as bandit_config
+    from bandit.core import manager as bandit_manager
+    
+    temp_file = _write_temp_file(content, workspace)
+    try:
+        manager = bandit_manager.BanditManager(bandit_config.BanditConfig(), 'file', quiet=True)
+        manager.discover_files([temp_file])
+        manager.run_tests()
+        return [issue.as_dict() for issue in manager.get_issue_list()]
+    finally:
+        os.unlink(temp_file)
+
+
+def black_format(content: str) -> str:
+    """Format content with black.format_str (unchanged if black can't parse it)"""
+    import black
+    
+    try:
+        return black.format_str(content, mode=black.Mode())
+    except black.InvalidInput:
+        return content
+
+
+def isort_format(content: str) -> str:
+    """Sort the imports of content with isort.code"""
+    import isort
+    
+    return isort.code(content)
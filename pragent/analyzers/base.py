@@ -2,11 +2,21 @@
 Base classes for code analyzers
 """
 
+import asyncio
+import json
+import os
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Sequence, Set, Awaitable
+from dataclasses import dataclass, field
 from enum import Enum
 
+from .diff import ChangedLines
+from .pool import run_cpu_stage
+from .source import SourceView
+from .subprocesses import ToolError
+from .toolchain import ToolFailure
+
 
 class IssueSeverity(Enum):
     """Issue severity levels"""
@@ -38,6 +48,7 @@ class Issue:
     rule_id: str
     suggestion: Optional[str] = None
     code_snippet: Optional[str] = None
+    end_line_number: Optional[int] = None  # last line of a multi-line issue
 
 
 @dataclass
@@ -48,19 +59,165 @@ class AnalysisResult:
     metrics: Dict[str, Any]
     score: float  # 0-100
     summary: str
+    complete: bool = True  # False if a tool was unavailable or failed; such results are not cached
+
+
+@dataclass
+class AnalysisContext:
+    """Per-file information the agent shares with analyzers"""
+    changed_lines: Optional[ChangedLines] = None  # restrict line checks to these lines
+    skipped_stages: Set[str] = field(default_factory=set)  # stages shed to meet a deadline
+    tool_deadline: Optional[float] = None  # time.monotonic() at which running tools are abandoned
+    workspace: Optional[str] = None  # per-PR scratch directory, RAM-backed where available
+    repo: Optional[str] = None  # repository the PR belongs to
+    source: Optional[SourceView] = None  # lines, AST and tokens of the file, shared by analyzers
+    shared_rules: Set[str] = field(default_factory=set)  # shared rules the agent runs once for all analyzers
+    tool_failures: Optional[List[ToolFailure]] = None  # failed tool runs of the PR, collected by the agent
+
+
+def iter_lines(lines: Sequence[str], context: Optional[AnalysisContext] = None) -> Iterable[Tuple[int, str]]:
+    """Iterate over (line_number, line), limited to changed lines in diff-aware mode"""
+    if context is None or context.changed_lines is None:
+        return enumerate(lines, 1)
+    return ((i, lines[i - 1]) for i in context.changed_lines.iter_lines(len(lines)))
 
 
 class Analyzer(ABC):
     """Abstract base class for code analyzers"""
     
+    # Degradation stage that covers the whole analyzer, if any
+    stage: Optional[str] = None
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self.cpu_executor = None  # process pool for analyze_cpu, set by the agent
+        self.tool_executor = None  # warm worker pool for in-process tools, set by the agent
+        self.tool_backend = config.get('tool_backend', 'subprocess')
+        self.toolchain = None  # tool availability and failure registry, set by the agent
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['cpu_executor'] = None
+        state['tool_executor'] = None
+        state['toolchain'] = None  # holds a lock; worker processes only run CPU stages
+        return state
     
     @abstractmethod
-    async def analyze(self, file_path: str, content: str) -> AnalysisResult:
+    async def analyze(self, file_path: str, content: str,
+                      context: Optional[AnalysisContext] = None) -> AnalysisResult:
         """Analyze a file and return results"""
         pass
     
+    def has_batch_stage(self, context: Optional[AnalysisContext] = None) -> bool:
+        """Check whether the agent should call analyze_batch for this PR"""
+        return False
+    
+    async def analyze_batch(self, files: Dict[str, str],
+                            context: Optional[AnalysisContext] = None) -> Dict[str, List[Issue]]:
+        """Analyze all changed files of a PR at once, returning extra issues per file path"""
+        return {}
+    
+    async def close(self) -> None:
+        """Release long-lived resources such as tool daemons"""
+        pass
+    
+    def analyze_cpu(self, file_path: str, content: str,
+                    context: Optional[AnalysisContext] = None) -> Tuple[List[Issue], Dict[str, Any]]:
+        """Run the CPU-bound checks of the analysis (no I/O)"""
+        return [], {}
+    
+    async def _run_cpu_stage(self, file_path: str, content: str,
+                             context: Optional[AnalysisContext] = None) -> Tuple[List[Issue], Dict[str, Any]]:
+        """Run analyze_cpu inline or, when a process pool is set, in a worker process"""
+        if self.cpu_executor is None:
+            return self.analyze_cpu(file_path, content, context)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.cpu_executor, run_cpu_stage, self.__class__.__name__, file_path, content, context
+        )
+    
+    async def _call_tool(self, func: Any, *args: Any) -> Any:
+        """Call an in-process tool backend in the warm tool worker pool"""
+        if self.tool_executor is None:
+            return func(*args)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.tool_executor, func, *args)
+    
+    def _write_workspace(self, workspace: str, files: Dict[str, str]) -> Dict[str, str]:
+        """Mirror files into a workspace by repository path, returning {relative path: file path}"""
+        workspace_paths = {}
+        for file_path, content in files.items():
+            relative_path = os.path.normpath(file_path.lstrip('/'))
+            if relative_path.startswith('..'):
+                continue
+            target = os.path.join(workspace, relative_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(content)
+            workspace_paths[relative_path] = file_path
+        return workspace_paths
+    
+    def get_shared_rules(self) -> Dict[str, Dict[str, Any]]:
+        """Shared rules (see rules.RULES) this analyzer enables, with their options"""
+        return {}
+    
+    def get_required_tools(self) -> List[str]:
+        """External tools this analyzer runs with its current configuration"""
+        return []
+    
+    def get_inprocess_tools(self) -> List[str]:
+        """Required tools this analyzer runs through their Python APIs rather than their CLI"""
+        return []
+    
+    def _tool_available(self, tool: str) -> bool:
+        """Check the toolchain registry before running a tool"""
+        return self.toolchain is None or self.toolchain.is_available(tool)
+    
+    def _record_tool_failure(self, tool: str, error: Exception, file_path: Optional[str] = None,
+                             context: Optional[AnalysisContext] = None) -> None:
+        """Record why a tool run failed, so it isn't mistaken for a clean result"""
+        if isinstance(error, ToolError):
+            reason, detail = error.reason, error.detail
+        elif isinstance(error, json.JSONDecodeError):
+            reason, detail = 'bad-output', str(error)
+        else:
+            reason, detail = 'error', f"{type(error).__name__}: {error}"
+        
+        failure = ToolFailure(tool, reason, detail, file_path)
+        if self.toolchain is not None:
+            self.toolchain.record_failure(failure)
+        if context is not None and context.tool_failures is not None:
+            context.tool_failures.append(failure)
+    
+    def _get_source(self, content: str, context: Optional[AnalysisContext] = None) -> SourceView:
+        """Use the file's shared source view, building one if the caller didn't"""
+        if context is not None and context.source is not None:
+            return context.source
+        return SourceView(content)
+    
+    async def _run_tool_stage(self, run: Awaitable[Optional[List[Issue]]],
+                              context: Optional[AnalysisContext] = None) -> Optional[List[Issue]]:
+        """Await a tool run, abandoning it (None) once the context's tool deadline passes
+        
+        An abandoned run marks the 'tools' stage skipped for the file, and the
+        analyzer's own checks still report.
+        """
+        deadline = context.tool_deadline if context is not None else None
+        if deadline is None:
+            return await run
+        
+        try:
+            return await asyncio.wait_for(run, max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            context.skipped_stages.add('tools')
+            return None
+    
+    def _is_stage_skipped(self, stage: str, context: Optional[AnalysisContext] = None) -> bool:
+        """Check whether a stage (e.g. 'tools') has been shed for this file"""
+        return context is not None and stage in context.skipped_stages
+    
     @abstractmethod
     def get_supported_extensions(self) -> List[str]:
         """Get list of supported file extensions"""
@@ -93,7 +250,8 @@ class Analyzer(ABC):
                      message: str, rule_id: str, 
                      suggestion: Optional[str] = None,
                      column_number: Optional[int] = None,
-                     code_snippet: Optional[str] = None) -> Issue:
+                     code_snippet: Optional[str] = None,
+                     end_line_number: Optional[int] = None) -> Issue:
         """Helper method to create issues"""
         return Issue(
             file_path=file_path,
@@ -104,6 +262,7 @@ class Analyzer(ABC):
             message=message,
             rule_id=rule_id,
             suggestion=suggestion,
-            code_snippet=code_snippet
+            code_snippet=code_snippet,
+            end_line_number=end_line_number
         )
 
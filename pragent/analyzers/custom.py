@@ -0,0 +1,241 @@
+"""
+Custom regex rules from the configuration, prefiltered by required literals
+"""
+
+import re
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple, Sequence, Container, Set
+
+from .base import Analyzer, AnalysisContext, AnalysisResult, Issue, IssueSeverity, IssueType
+from .scanner import LineRule, fold_case, required_literals
+from .source import SourceView
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Rules whose literals are all shorter than this are checked on every line instead
+MIN_LITERAL_LENGTH = 2
+
+
+def _trie_pattern(literals: Sequence[str]) -> str:
+    """Regex matching any of the literals, with shared prefixes factored out so it scales with their number"""
+    trie: Dict[str, Any] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def render(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A literal ending here makes the rest optional
+        return f'(?:{pattern})?' if '' in node else pattern
+    
+    return render(trie)
+
+
+class LiteralMatcher:
+    """Finds the lines of a text that hold any of many literals, in one pass
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed. Otherwise a
+    trie-shaped alternation of the literals finds the candidate lines, and each
+    candidate line is then checked for every literal.
+    """
+    
+    def __init__(self, literals: Sequence[str]):
+        self.literals = sorted(set(literals), key=len, reverse=True)
+        self._automaton = None
+        self._pattern = None
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for literal in self.literals:
+                self._automaton.add_word(literal, literal)
+            self._automaton.make_automaton()
+        else:
+            self._pattern = re.compile(_trie_pattern(self.literals))
+    
+    def find_lines(self, text: str, offsets: Sequence[int]) -> Dict[int, Set[str]]:
+        """Map each (1-based) line holding a literal to the literals it holds"""
+        lines: Dict[int, Set[str]] = {}
+        if not self.literals:
+            return lines
+        
+        if self._automaton is not None:
+            for end, literal in self._automaton.iter(text):
+                lines.setdefault(bisect_right(offsets, end), set()).add(literal)
+            return lines
+        
+        # Literals never span lines, so the first match on a line is enough to pick it
+        position = 0
+        while True:
+            match = self._pattern.search(text, position)
+            if match is None:
+                break
+            line_number = bisect_right(offsets, match.start())
+            line_end = offsets[line_number] if line_number < len(offsets) else len(text)
+            line = text[offsets[line_number - 1]:line_end]
+            lines[line_number] = {literal for literal in self.literals if literal in line}
+            if line_number >= len(offsets):
+                break
+            position = line_end
+        return lines
+
+
+class CustomRuleEngine:
+    """Runs many line rules, sending a line to a rule's regex only if it holds one of the rule's literals
+
+    The literal prefilter makes the cost of a scan depend on the text and on the
+    rules that can match it, not on the size of the rule set. Rules without
+    usable literals are checked on every line, each with its own regex: user
+    patterns can't safely share one alternation (global flags, repeated group
+    names and numbered backreferences all break when joined).
+    """
+    
+    def __init__(self, rules: Sequence[LineRule]):
+        self.rules = tuple(rules)
+        self._patterns = [re.compile(rule.pattern, rule.flags) for rule in self.rules]
+        self._rules_by_literal: Dict[str, List[int]] = {}
+        unfiltered = []
+        
+        for index, rule in enumerate(self.rules):
+            literals = required_literals(rule.pattern, rule.flags)
+            if literals is None or min(map(len, literals)) < MIN_LITERAL_LENGTH:
+                unfiltered.append(index)
+                continue
+            for literal in literals:
+                self._rules_by_literal.setdefault(literal, []).append(index)
+        
+        self._matcher = LiteralMatcher(list(self._rules_by_literal))
+        self._unfiltered = unfiltered
+    
+    def candidates(self, source: SourceView) -> Dict[int, Set[int]]:
+        """Map each line holding a required literal to the rules it may match"""
+        candidates: Dict[int, Set[int]] = {}
+        rules_by_literal = self._rules_by_literal
+        if not rules_by_literal:
+            return candidates
+        
+        if source.text.isascii():
+            # Folding ASCII keeps every offset, so one pass over the whole text suffices
+            found = self._matcher.find_lines(source.text.lower(), source.offsets)
+        else:
+            found = {}
+            for line_number, line in enumerate(source.lines, 1):
+                literals = self._matcher.find_lines(fold_case(line), (0,)).get(1)
+                if literals:
+                    found[line_number] = literals
+        
+        for line_number, literals in found.items():
+            candidates[line_number] = {index for literal in literals for index in rules_by_literal[literal]}
+        return candidates
+    
+    def scan(self, source: SourceView,
+             line_filter: Optional[Container[int]] = None) -> List[Tuple[LineRule, int, str]]:
+        """Return (rule, line_number, line) for every rule match, ordered by rule and line"""
+        lines = source.lines
+        hits = []
+        
+        for line_number, indexes in self.candidates(source).items():
+            if line_filter is not None and line_number not in line_filter:
+                continue
+            line = lines[line_number - 1]
+            for index in indexes:
+                if self._patterns[index].search(line):
+                    hits.append((index, line_number))
+        
+        for index in self._unfiltered:
+            pattern = self._patterns[index]
+            for line_number, line in enumerate(lines, 1):
+                if (line_filter is None or line_number in line_filter) and pattern.search(line):
+                    hits.append((index, line_number))
+        
+        hits.sort()
+        return [(self.rules[index], line_number, lines[line_number - 1]) for index, line_number in hits]
+
+
+class CustomRuleAnalyzer(Analyzer):
+    """Analyzer for the regex rules configured in custom_rules"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.rules = [self._build_rule(index, rule) for index, rule in enumerate(config.get('custom_rules', []))]
+        self._engine = CustomRuleEngine(self.rules)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes recompile the engine rather than unpickling the automaton
+        state = super().__getstate__()
+        state['_engine'] = None
+        return state
+    
+    def _build_rule(self, index: int, rule: Any) -> LineRule:
+        """Convert a configured rule (a pattern, or a dict with a pattern) into a line rule"""
+        if isinstance(rule, str):
+            rule = {'pattern': rule}
+        rule_id = rule.get('id') or f"custom-rule-{index + 1}"
+        pattern = rule['pattern']
+        flags = re.IGNORECASE if rule.get('ignore_case') else 0
+        
+        try:
+            re.compile(pattern, flags)
+            severity = IssueSeverity(rule.get('severity', 'medium'))
+            issue_type = IssueType(rule.get('issue_type', 'maintainability'))
+        except (re.error, ValueError) as e:
+            raise ValueError(f"Invalid custom rule '{rule_id}': {e}") from e
+        
+        return LineRule(
+            rule_id=rule_id,
+            pattern=pattern,
+            message=rule.get('message') or f"Matches custom rule '{rule_id}'",
+            severity=severity,
+            issue_type=issue_type,
+            suggestion=rule.get('suggestion') or '',
+            flags=flags
+        )
+    
+    async def analyze(self, file_path: str, content: str,
+                      context: Optional[AnalysisContext] = None) -> AnalysisResult:
+        """Check the custom rules"""
+        issues, metrics = await self._run_cpu_stage(file_path, content, context)
+        
+        return AnalysisResult(
+            file_path=file_path,
+            issues=issues,
+            metrics=metrics,
+            score=self._calculate_score(issues),
+            summary=f"Found {len(issues)} custom rule violations" if issues else "No custom rule violations found"
+        )
+    
+    def analyze_cpu(self, file_path: str, content: str,
+                    context: Optional[AnalysisContext] = None) -> Tuple[List[Issue], Dict[str, Any]]:
+        """Run the custom rules"""
+        if self._engine is None:
+            self._engine = CustomRuleEngine(self.rules)
+        
+        source = self._get_source(content, context)
+        line_filter = context.changed_lines if context is not None else None
+        
+        issues = [
+            self._create_issue(
+                file_path=file_path,
+                line_number=line_number,
+                severity=rule.severity,
+                issue_type=rule.issue_type,
+                message=rule.message,
+                rule_id=rule.rule_id,
+                suggestion=rule.suggestion,
+                code_snippet=line.strip()
+            )
+            for rule, line_number, line in self._engine.scan(source, line_filter)
+        ]
+        return issues, {}
+    
+    def get_supported_extensions(self) -> List[str]:
+        """Get supported file extensions"""
+        return ['.py', '.js', '.ts', '.java', '.go', '.php', '.rb', '.cpp', '.c', '.h']
@@ -0,0 +1,71 @@
+"""
+Unified diff parsing for diff-aware analysis
+"""
+
+import re
+from bisect import bisect_right
+from typing import List, Tuple, Iterator
+
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@')
+
+
+class ChangedLines:
+    """Index of the line ranges touched by a diff, in new-file line numbers"""
+    
+    def __init__(self, ranges: List[Tuple[int, int]], margin: int = 0):
+        # Widen the ranges by the context margin and merge overlapping ones
+        merged: List[List[int]] = []
+        for start, end in sorted(ranges):
+            start, end = max(1, start - margin), end + margin
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        
+        self.ranges = [(start, end) for start, end in merged]
+        self._starts = [start for start, _ in self.ranges]
+    
+    @classmethod
+    def from_diff(cls, diff: str, margin: int = 0) -> "ChangedLines":
+        """Parse a unified diff (as found in FileChange.diff)"""
+        ranges = []
+        new_line = 0
+        in_hunk = False
+        
+        for line in diff.split('\n'):
+            match = HUNK_HEADER.match(line)
+            if match:
+                new_line = int(match.group(1))
+                in_hunk = True
+            elif not in_hunk or line.startswith('\\'):
+                continue
+            elif line.startswith('+'):
+                ranges.append((new_line, new_line))
+                new_line += 1
+            elif line.startswith('-'):
+                # A removed line touches the line that now takes its place
+                ranges.append((max(1, new_line), max(1, new_line)))
+            else:
+                new_line += 1
+        
+        return cls(ranges, margin)
+    
+    def __contains__(self, line_number: int) -> bool:
+        index = bisect_right(self._starts, line_number) - 1
+        return index >= 0 and line_number <= self.ranges[index][1]
+    
+    def overlaps(self, start: int, end: int) -> bool:
+        """Check whether any line in [start, end] is changed"""
+        index = bisect_right(self._starts, end) - 1
+        return index >= 0 and start <= self.ranges[index][1]
+    
+    def __bool__(self) -> bool:
+        return bool(self.ranges)
+    
+    def iter_lines(self, line_count: int) -> Iterator[int]:
+        """Iterate over changed line numbers, clipped to the file length"""
+        for start, end in self.ranges:
+            if start > line_count:
+                break
+            yield from range(start, min(end, line_count) + 1)
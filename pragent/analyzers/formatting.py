@@ -0,0 +1,59 @@
+"""
+Formatter checks computed from formatted output
+"""
+
+from difflib import SequenceMatcher
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class FormatHunk:
+    """A contiguous block of original lines that the formatter would change"""
+    start_line: int  # 1-based, inclusive
+    end_line: int  # 1-based, inclusive
+    original: List[str]
+    formatted: List[str]
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split on '\n' only, like SourceView.lines, so line numbers match the file's"""
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+def format_hunks(original: str, formatted: str) -> List[FormatHunk]:
+    """Compute the changed line ranges between a file and its formatted version"""
+    if original == formatted:
+        return []
+    
+    # str.splitlines() would also split on form feeds, \u2028 and the like
+    original_lines = _split_lines(original)
+    formatted_lines = _split_lines(formatted)
+    matcher = SequenceMatcher(None, original_lines, formatted_lines, autojunk=False)
+    
+    # Merge adjacent non-equal opcodes into one hunk
+    spans = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        if spans and spans[-1][1] == i1 and spans[-1][3] == j1:
+            spans[-1][1], spans[-1][3] = i2, j2
+        else:
+            spans.append([i1, i2, j1, j2])
+    
+    last_line = max(1, len(original_lines))
+    hunks = []
+    for i1, i2, j1, j2 in spans:
+        # Pure insertions point at the line the new code goes before
+        start_line = min(i1 + 1, last_line)
+        hunks.append(FormatHunk(
+            start_line=start_line,
+            end_line=max(start_line, min(i2, last_line)),
+            original=original_lines[i1:i2],
+            formatted=formatted_lines[j1:j2]
+        ))
+    
+    return hunks
@@ -0,0 +1,40 @@
+"""
+Process pool for offloading CPU-bound analysis stages
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+
+# Analyzers initialized once per worker process, keyed by class name
+_worker_analyzers: Dict[str, Any] = {}
+
+
+def _init_worker(analyzers: List[Any]) -> None:
+    """Install the pickled analyzers in a freshly started worker"""
+    for analyzer in analyzers:
+        analyzer.cpu_executor = None
+        _worker_analyzers[analyzer.__class__.__name__] = analyzer
+
+
+def run_cpu_stage(analyzer_name: str, file_path: str, content: str,
+                  context: Any = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """Run an analyzer's CPU-bound stage inside a worker process"""
+    return _worker_analyzers[analyzer_name].analyze_cpu(file_path, content, context)
+
+
+def create_process_pool(analyzers: List[Any], max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Create a process pool whose workers hold a copy of the given analyzers
+    
+    Workers start lazily, so a forked one could inherit the stdin pipe of a tool
+    run in flight and keep that tool from ever seeing EOF. They are started from
+    a forkserver (or spawned) instead.
+    """
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=_init_worker,
+        initargs=(list(analyzers),)
+    )
@@ -3,13 +3,52 @@ Code quality analyzer using pylint and other tools
 """
 
 import ast
-import subprocess
+import asyncio
+import json
 import tempfile
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
-from .base import Analyzer, AnalysisResult, Issue, IssueSeverity, IssueType
+from . import backends
+from .subprocesses import run_tool
+from .base import Analyzer, AnalysisContext, AnalysisResult, Issue, IssueSeverity, IssueType
+from .rules import run_shared_rules
+from .source import SourceView
+
+
+# Severity of ruff rule codes, matched by longest prefix
+RUFF_SEVERITY = {
+    'invalid-syntax': 'high',
+    'E9': 'high',
+    'F63': 'high',
+    'F7': 'high',
+    'F82': 'high',
+    'PLE': 'high',
+    'F': 'medium',
+    'B': 'medium',
+    'S': 'medium',
+    'PLW': 'medium',
+    'E': 'low',
+    'W': 'low',
+    'C': 'low',
+    'I': 'low',
+    'N': 'low',
+    'D': 'low',
+    'UP': 'low',
+    'PLC': 'low',
+    'PLR': 'low'
+}
+
+# pylint checks already covered by ruff's default rules, disabled in ruff+pylint mode
+RUFF_COVERED_PYLINT_CHECKS = [
+    'unused-import', 'unused-variable', 'undefined-variable', 'reimported',
+    'bare-except', 'multiple-statements', 'unnecessary-semicolon',
+    'f-string-without-interpolation', 'wildcard-import', 'return-outside-function',
+    'yield-outside-function', 'unused-wildcard-import'
+]
+
+LINT_BACKENDS = ('pylint', 'ruff', 'ruff+pylint')
 
 
 class QualityAnalyzer(Analyzer):
@@ -18,28 +57,40 @@ class QualityAnalyzer(Analyzer):
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.enable_pylint = config.get('enable_pylint', True)
+        self.pylint_batch = config.get('pylint_batch', False)
+        self.pylint_jobs = config.get('pylint_jobs', 0)
+        self.lint_backend = config.get('lint_backend', 'pylint')
+        if self.lint_backend not in LINT_BACKENDS:
+            raise ValueError(f"Unsupported lint backend: {self.lint_backend}")
+        self.use_pylint = self.enable_pylint and 'pylint' in self.lint_backend.split('+')
+        self.use_ruff = 'ruff' in self.lint_backend.split('+')
+        self.ruff_select = config.get('ruff_select', [])
+        self.ruff_severity = {**RUFF_SEVERITY, **config.get('ruff_severity', {})}
         self.min_complexity = config.get('min_complexity_score', 5)
         self.max_line_length = config.get('max_line_length', 88)
     
-    async def analyze(self, file_path: str, content: str) -> AnalysisResult:
+    async def analyze(self, file_path: str, content: str,
+                      context: Optional[AnalysisContext] = None) -> AnalysisResult:
         """Analyze code quality"""
         issues = []
         metrics = {}
+        complete = True
         
-        # Run pylint if enabled
-        if self.enable_pylint and file_path.endswith('.py'):
-            pylint_issues = await self._run_pylint(file_path, content)
-            issues.extend(pylint_issues)
+        # Run pylint if enabled (batch mode and ruff run once per PR in analyze_batch)
+        if (self.use_pylint and not self.pylint_batch and file_path.endswith('.py')
+                and not self._is_stage_skipped('tools', context)):
+            pylint_issues = None  # an unavailable tool leaves the result incomplete
+            if self._tool_available('pylint'):
+                pylint_issues = await self._run_tool_stage(self._run_pylint(file_path, content, context), context)
+            if pylint_issues is None:
+                complete = False
+            else:
+                issues.extend(pylint_issues)
         
-        # AST-based analysis
-        if file_path.endswith('.py'):
-            ast_issues, ast_metrics = await self._analyze_ast(file_path, content)
-            issues.extend(ast_issues)
-            metrics.update(ast_metrics)
-        
-        # Line length analysis
-        length_issues = self._check_line_lengths(file_path, content)
-        issues.extend(length_issues)
+        # AST and line length analysis
+        cpu_issues, cpu_metrics = await self._run_cpu_stage(file_path, content, context)
+        issues.extend(cpu_issues)
+        metrics.update(cpu_metrics)
         
         # Calculate score
         score = self._calculate_score(issues)
@@ -52,119 +103,274 @@ class QualityAnalyzer(Analyzer):
             issues=issues,
             metrics=metrics,
             score=score,
-            summary=summary
+            summary=summary,
+            complete=complete
         )
     
-    async def _run_pylint(self, file_path: str, content: str) -> List[Issue]:
-        """Run pylint analysis"""
+    def analyze_cpu(self, file_path: str, content: str,
+                    context: Optional[AnalysisContext] = None) -> tuple[List[Issue], Dict[str, Any]]:
+        """Run AST-based and line length checks"""
         issues = []
+        metrics = {}
+        source = self._get_source(content, context)
+        
+        # AST-based analysis
+        if file_path.endswith('.py'):
+            ast_issues, ast_metrics = self._analyze_ast(file_path, source)
+            issues.extend(ast_issues)
+            metrics.update(ast_metrics)
+        
+        # Line length analysis, unless the agent runs it once for all analyzers
+        length_issues = run_shared_rules(self, file_path, source, context)
+        issues.extend(length_issues)
+        
+        return issues, metrics
+    
+    async def _run_pylint(self, file_path: str, content: str,
+                          context: Optional[AnalysisContext] = None) -> Optional[List[Issue]]:
+        """Run pylint analysis, returning None if pylint failed"""
+        issues = []
+        workspace = context.workspace if context is not None else None
+        
+        if self.tool_backend == 'inprocess':
+            try:
+                for item in await self._call_tool(
+                    backends.pylint_messages, content, workspace, self._pylint_options()
+                ):
+                    issues.append(self._create_pylint_issue(file_path, item))
+            except Exception as e:
+                # If pylint fails, record why and continue without it
+                self._record_tool_failure('pylint', e, file_path, context)
+                return None
+            return issues
         
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(content)
-                temp_file = f.name
-            
-            # Run pylint
-            result = subprocess.run([
-                'pylint', temp_file, '--output-format=json'
-            ], capture_output=True, text=True, timeout=30)
+            # Run pylint on the content piped over stdin
+            result = await run_tool([
+                'pylint', '--output-format=json', *self._pylint_options(),
+                '--from-stdin', os.path.basename(file_path)
+            ], timeout=30, input=content, cwd=workspace)
             
             # Parse pylint output
             if result.stdout:
-                import json
-                try:
-                    pylint_results = json.loads(result.stdout)
-                    for item in pylint_results:
-                        severity_map = {
-                            'error': IssueSeverity.HIGH,
-                            'warning': IssueSeverity.MEDIUM,
-                            'info': IssueSeverity.LOW,
-                            'refactor': IssueSeverity.LOW
-                        }
-                        
-                        issues.append(self._create_issue(
-                            file_path=file_path,
-                            line_number=item['line'],
-                            severity=severity_map.get(item['type'], IssueSeverity.MEDIUM),
-                            issue_type=IssueType.MAINTAINABILITY,
-                            message=item['message'],
-                            rule_id=item['message-id'],
-                            suggestion=item.get('suggestion', ''),
-                            column_number=item.get('column', None)
-                        ))
-                except json.JSONDecodeError:
-                    pass
-            
-            # Clean up
-            os.unlink(temp_file)
+                for item in json.loads(result.stdout):
+                    issues.append(self._create_pylint_issue(file_path, item))
             
         except Exception as e:
-            # If pylint fails, continue without it
-            pass
+            # If pylint fails (or its output is unreadable), record why and continue without it
+            self._record_tool_failure('pylint', e, file_path, context)
+            return None
         
         return issues
     
-    async def _analyze_ast(self, file_path: str, content: str) -> tuple[List[Issue], Dict[str, Any]]:
-        """Analyze code using AST"""
-        issues = []
-        metrics = {}
+    def get_shared_rules(self) -> Dict[str, Dict[str, Any]]:
+        """Get the shared rules in use"""
+        return {'line-too-long': {'max_line_length': self.max_line_length}}
+    
+    def get_required_tools(self) -> List[str]:
+        """Get the lint tools of the selected backend"""
+        return (['pylint'] if self.use_pylint else []) + (['ruff'] if self.use_ruff else [])
+    
+    def get_inprocess_tools(self) -> List[str]:
+        """pylint runs in-process per file; batch mode and ruff always use the CLI"""
+        if self.tool_backend == 'inprocess' and self.use_pylint and not self.pylint_batch:
+            return ['pylint']
+        return []
+    
+    def _pylint_options(self) -> List[str]:
+        """Extra pylint options for the selected lint backend"""
+        if self.use_ruff:
+            return ['--disable=' + ','.join(RUFF_COVERED_PYLINT_CHECKS)]
+        return []
+    
+    def has_batch_stage(self, context: Optional[AnalysisContext] = None) -> bool:
+        """Ruff, and pylint in batch mode, run once over the whole PR"""
+        if self._is_stage_skipped('tools', context):
+            return False
+        return self._batch_pylint() or self._batch_ruff()
+    
+    def _batch_pylint(self) -> bool:
+        return self.use_pylint and self.pylint_batch and self._tool_available('pylint')
+    
+    def _batch_ruff(self) -> bool:
+        return self.use_ruff and self._tool_available('ruff')
+    
+    async def analyze_batch(self, files: Dict[str, str],
+                            context: Optional[AnalysisContext] = None) -> Dict[str, List[Issue]]:
+        """Lint all changed Python files of a PR with a single ruff and/or pylint process"""
+        python_files = {path: content for path, content in files.items() if path.endswith('.py')}
+        if not python_files:
+            return {}
+        
+        issues = {file_path: [] for file_path in python_files}
         
         try:
-            tree = ast.parse(content)
-            
-            # Calculate cyclomatic complexity
-            complexity = self._calculate_complexity(tree)
-            metrics['cyclomatic_complexity'] = complexity
-            
-            if complexity > self.min_complexity:
-                issues.append(self._create_issue(
-                    file_path=file_path,
-                    line_number=1,
-                    severity=IssueSeverity.MEDIUM,
-                    issue_type=IssueType.MAINTAINABILITY,
-                    message=f"High cyclomatic complexity: {complexity}",
-                    rule_id="high-complexity",
-                    suggestion=f"Consider breaking down this function. Current complexity: {complexity}"
-                ))
-            
-            # Check for long functions
-            long_functions = self._find_long_functions(tree)
-            for func_name, line_count in long_functions:
-                if line_count > 50:  # Arbitrary threshold
-                    issues.append(self._create_issue(
-                        file_path=file_path,
-                        line_number=1,  # Would need to track actual line
-                        severity=IssueSeverity.LOW,
-                        issue_type=IssueType.MAINTAINABILITY,
-                        message=f"Long function '{func_name}': {line_count} lines",
-                        rule_id="long-function",
-                        suggestion="Consider breaking this function into smaller functions"
-                    ))
+            workspace_root = context.workspace if context is not None else None
+            with tempfile.TemporaryDirectory(prefix='lint-', dir=workspace_root) as workspace:
+                # Mirror the repository layout so relative imports and messages line up
+                workspace_paths = self._write_workspace(workspace, python_files)
+                
+                linters = []
+                if self._batch_pylint():
+                    linters.append(self._run_pylint_batch(workspace, workspace_paths, issues, context))
+                if self._batch_ruff():
+                    linters.append(self._run_ruff_batch(workspace, workspace_paths, issues, context))
+                await asyncio.gather(*linters)
+        
+        except Exception as e:
+            # If the workspace can't be set up, record why and continue without linting
+            self._record_tool_failure('pylint' if self.use_pylint else 'ruff', e, context=context)
+        
+        return issues
+    
+    async def _run_pylint_batch(self, workspace: str, workspace_paths: Dict[str, str],
+                                issues: Dict[str, List[Issue]],
+                                context: Optional[AnalysisContext] = None) -> None:
+        """Run one pylint process over a PR workspace"""
+        try:
+            result = await run_tool([
+                'pylint', f'--jobs={self.pylint_jobs}', '--output-format=json',
+                *self._pylint_options(), *workspace_paths
+            ], timeout=300, cwd=workspace)
             
-            # Check for duplicate code patterns
-            duplicate_patterns = self._find_duplicate_patterns(tree)
-            for pattern, count in duplicate_patterns.items():
-                if count > 3:  # Arbitrary threshold
-                    issues.append(self._create_issue(
-                        file_path=file_path,
-                        line_number=1,
-                        severity=IssueSeverity.LOW,
-                        issue_type=IssueType.MAINTAINABILITY,
-                        message=f"Potential code duplication: {pattern} appears {count} times",
-                        rule_id="duplicate-code",
-                        suggestion="Consider extracting common code into a function"
-                    ))
+            # Map messages back to the original file paths
+            if result.stdout:
+                for item in json.loads(result.stdout):
+                    file_path = workspace_paths.get(os.path.normpath(item.get('path', '')))
+                    if file_path is not None:
+                        issues[file_path].append(self._create_pylint_issue(file_path, item))
+        
+        except Exception as e:
+            # If pylint fails, record why and continue without it
+            self._record_tool_failure('pylint', e, context=context)
+    
+    async def _run_ruff_batch(self, workspace: str, workspace_paths: Dict[str, str],
+                              issues: Dict[str, List[Issue]],
+                              context: Optional[AnalysisContext] = None) -> None:
+        """Run one ruff process over a PR workspace"""
+        options = [f'--line-length={self.max_line_length}']
+        if self.ruff_select:
+            options.append('--select=' + ','.join(self.ruff_select))
+        
+        try:
+            result = await run_tool([
+                'ruff', 'check', '--output-format=json', '--exit-zero', '--no-cache',
+                '--isolated', '--quiet', *options, *workspace_paths
+            ], timeout=60, cwd=workspace)
             
-        except SyntaxError as e:
+            # Map diagnostics back to the original file paths
+            if result.stdout:
+                root = os.path.realpath(workspace)
+                for item in json.loads(result.stdout):
+                    relative_path = os.path.relpath(os.path.realpath(item.get('filename', '')), root)
+                    file_path = workspace_paths.get(relative_path)
+                    if file_path is not None:
+                        issues[file_path].append(self._create_ruff_issue(file_path, item))
+        
+        except Exception as e:
+            # If ruff fails, record why and continue without it
+            self._record_tool_failure('ruff', e, context=context)
+    
+    def _create_ruff_issue(self, file_path: str, item: Dict[str, Any]) -> Issue:
+        """Convert a ruff JSON diagnostic into an issue"""
+        code = item.get('code') or 'invalid-syntax'
+        prefix = max((prefix for prefix in self.ruff_severity if code.startswith(prefix)), key=len, default=None)
+        severity = IssueSeverity(self.ruff_severity[prefix]) if prefix else IssueSeverity.MEDIUM
+        location = item.get('location') or {}
+        end_location = item.get('end_location') or {}
+        
+        return self._create_issue(
+            file_path=file_path,
+            line_number=location.get('row', 1),
+            end_line_number=end_location.get('row'),
+            severity=severity,
+            issue_type=IssueType.MAINTAINABILITY,
+            message=item.get('message', ''),
+            rule_id=code,
+            suggestion=(item.get('fix') or {}).get('message') or '',
+            column_number=location.get('column')
+        )
+    
+    def _create_pylint_issue(self, file_path: str, item: Dict[str, Any]) -> Issue:
+        """Convert a pylint JSON message into an issue"""
+        severity_map = {
+            'error': IssueSeverity.HIGH,
+            'warning': IssueSeverity.MEDIUM,
+            'info': IssueSeverity.LOW,
+            'refactor': IssueSeverity.LOW
+        }
+        
+        return self._create_issue(
+            file_path=file_path,
+            line_number=item['line'],
+            severity=severity_map.get(item['type'], IssueSeverity.MEDIUM),
+            issue_type=IssueType.MAINTAINABILITY,
+            message=item['message'],
+            rule_id=item['message-id'],
+            suggestion=item.get('suggestion', ''),
+            column_number=item.get('column', None)
+        )
+    
+    def _analyze_ast(self, file_path: str, source: SourceView) -> tuple[List[Issue], Dict[str, Any]]:
+        """Analyze code using AST"""
+        issues = []
+        metrics = {}
+        
+        tree = source.tree
+        if tree is None:
+            error = source.syntax_error
             issues.append(self._create_issue(
                 file_path=file_path,
-                line_number=e.lineno or 1,
+                line_number=error.lineno or 1,
                 severity=IssueSeverity.CRITICAL,
                 issue_type=IssueType.BUG,
-                message=f"Syntax error: {e.msg}",
+                message=f"Syntax error: {error.msg}",
                 rule_id="syntax-error"
             ))
+            return issues, metrics
+        
+        # Calculate cyclomatic complexity
+        complexity = self._calculate_complexity(tree)
+        metrics['cyclomatic_complexity'] = complexity
+        
+        if complexity > self.min_complexity:
+            issues.append(self._create_issue(
+                file_path=file_path,
+                line_number=1,
+                severity=IssueSeverity.MEDIUM,
+                issue_type=IssueType.MAINTAINABILITY,
+                message=f"High cyclomatic complexity: {complexity}",
+                rule_id="high-complexity",
+                suggestion=f"Consider breaking down this function. Current complexity: {complexity}"
+            ))
+        
+        # Check for long functions
+        long_functions = self._find_long_functions(tree)
+        for func_name, line_count in long_functions:
+            if line_count > 50:  # Arbitrary threshold
+                issues.append(self._create_issue(
+                    file_path=file_path,
+                    line_number=1,  # Would need to track actual line
+                    severity=IssueSeverity.LOW,
+                    issue_type=IssueType.MAINTAINABILITY,
+                    message=f"Long function '{func_name}': {line_count} lines",
+                    rule_id="long-function",
+                    suggestion="Consider breaking this function into smaller functions"
+                ))
+        
+        # Check for duplicate code patterns
+        duplicate_patterns = self._find_duplicate_patterns(tree)
+        for pattern, count in duplicate_patterns.items():
+            if count > 3:  # Arbitrary threshold
+                issues.append(self._create_issue(
+                    file_path=file_path,
+                    line_number=1,
+                    severity=IssueSeverity.LOW,
+                    issue_type=IssueType.MAINTAINABILITY,
+                    message=f"Potential code duplication: {pattern} appears {count} times",
+                    rule_id="duplicate-code",
+                    suggestion="Consider extracting common code into a function"
+                ))
         
         return issues, metrics
     
@@ -207,25 +413,6 @@ class QualityAnalyzer(Analyzer):
         
         return patterns
     
-    def _check_line_lengths(self, file_path: str, content: str) -> List[Issue]:
-        """Check for lines that are too long"""
-        issues = []
-        lines = content.split('\n')
-        
-        for i, line in enumerate(lines, 1):
-            if len(line) > self.max_line_length:
-                issues.append(self._create_issue(
-                    file_path=file_path,
-                    line_number=i,
-                    severity=IssueSeverity.LOW,
-                    issue_type=IssueType.STYLE,
-                    message=f"Line too long: {len(line)} characters",
-                    rule_id="line-too-long",
-                    suggestion=f"Break this line into multiple lines (max {self.max_line_length} characters)"
-                ))
-        
-        return issues
-    
     def _generate_summary(self, issues: List[Issue], metrics: Dict[str, Any]) -> str:
         """Generate analysis summary"""
         if not issues:
@@ -0,0 +1,107 @@
+"""
+Registry of checks shared by several analyzers
+"""
+
+import json
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Callable, Tuple, Iterable
+
+from .base import AnalysisContext, Issue, IssueSeverity, IssueType, iter_lines
+from .source import SourceView
+
+
+# check(file_path, source, context, options) -> issues
+RuleCheck = Callable[[str, SourceView, Optional[AnalysisContext], Dict[str, Any]], List[Issue]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A check that any analyzer can enable, run once per file however many do"""
+    rule_id: str
+    owner: str  # analyzer the rule belongs to, for documentation and reports
+    inputs: Tuple[str, ...]  # SourceView artifacts the check reads: lines, offsets, tree, tokens
+    check: RuleCheck
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def register_rule(rule_id: str, owner: str, inputs: Iterable[str]) -> Callable[[RuleCheck], RuleCheck]:
+    """Register a check function under a rule ID"""
+    def decorator(check: RuleCheck) -> RuleCheck:
+        if rule_id in RULES:
+            raise ValueError(f"Rule '{rule_id}' is already registered")
+        RULES[rule_id] = Rule(rule_id, owner, tuple(inputs), check)
+        return check
+    return decorator
+
+
+def run_rule(rule_id: str, file_path: str, source: SourceView,
+             context: Optional[AnalysisContext], options: Dict[str, Any]) -> List[Issue]:
+    """Run a registered rule on one file"""
+    return RULES[rule_id].check(file_path, source, context, options)
+
+
+def run_shared_rules(analyzer: Any, file_path: str, source: SourceView,
+                     context: Optional[AnalysisContext] = None) -> List[Issue]:
+    """Run the shared rules an analyzer enables, except those the agent runs for it"""
+    issues = []
+    for rule_id, options in analyzer.get_shared_rules().items():
+        if context is not None and rule_id in context.shared_rules:
+            continue
+        issues.extend(run_rule(rule_id, file_path, source, context, options))
+    return issues
+
+
+@register_rule('line-too-long', owner='StyleAnalyzer', inputs=['lines'])
+def check_line_length(file_path: str, source: SourceView, context: Optional[AnalysisContext],
+                      options: Dict[str, Any]) -> List[Issue]:
+    """Check for lines longer than options['max_line_length']"""
+    max_line_length = options.get('max_line_length', 88)
+    issues = []
+    
+    for i, line in iter_lines(source.lines, context):
+        if len(line) > max_line_length:
+            issues.append(Issue(
+                file_path=file_path,
+                line_number=i,
+                column_number=None,
+                severity=IssueSeverity.LOW,
+                issue_type=IssueType.STYLE,
+                message=f"Line too long: {len(line)} characters",
+                rule_id="line-too-long",
+                suggestion=f"Break this line into multiple lines (max {max_line_length} characters)",
+                code_snippet=line.strip()
+            ))
+    
+    return issues
+
+
+class RulePlan:
+    """The shared rules the analyzers of one file enable, each with its consumers
+
+    Analyzers enabling a rule with identical options share one run; different
+    options give separate runs.
+    """
+    
+    def __init__(self, analyzers: Iterable[Any]):
+        self.runs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for analyzer in analyzers:
+            for rule_id, options in analyzer.get_shared_rules().items():
+                key = (rule_id, json.dumps(options, sort_keys=True, default=str))
+                run = self.runs.setdefault(key, {'rule_id': rule_id, 'options': options, 'consumers': []})
+                run['consumers'].append(analyzer.__class__.__name__)
+    
+    @property
+    def rule_ids(self) -> List[str]:
+        return sorted({run['rule_id'] for run in self.runs.values()})
+    
+    def execute(self, file_path: str, source: SourceView,
+                context: Optional[AnalysisContext] = None) -> Tuple[List[Issue], Dict[str, List[str]]]:
+        """Run every planned rule once, returning the issues and the consumers of each rule"""
+        issues = []
+        consumers: Dict[str, List[str]] = {}
+        for run in self.runs.values():
+            issues.extend(run_rule(run['rule_id'], file_path, source, context, run['options']))
+            consumers.setdefault(run['rule_id'], []).extend(run['consumers'])
+        return issues, consumers
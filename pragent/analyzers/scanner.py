@@ -0,0 +1,195 @@
+"""
+Single-pass scanner for line-level regex rules
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Container, FrozenSet
+
+from .base import IssueSeverity, IssueType
+from .source import line_offsets
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+
+@dataclass(frozen=True)
+class LineRule:
+    """A regex that flags every line it matches"""
+    rule_id: str
+    pattern: str
+    message: str
+    severity: IssueSeverity
+    issue_type: IssueType
+    suggestion: str
+    flags: int = 0
+
+
+# Characters that match ASCII case-insensitively but that casefold() leaves apart
+_CASE_FOLD_FIXES = {0x130: 'i', 0x131: 'i'}
+
+
+def fold_case(text: str) -> str:
+    """Casefold text so that case-insensitive literal matches become plain substring matches"""
+    return text.translate(_CASE_FOLD_FIXES).casefold()
+
+
+def literal_prefix(pattern: str, flags: int = 0) -> str:
+    """The literal text every match of pattern starts with ('' if there is none)"""
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return ''
+    
+    prefix = []
+    for op, av in parsed:
+        if op is not sre_parse.LITERAL:
+            break
+        prefix.append(chr(av))
+    return ''.join(prefix)
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[FrozenSet[str]]:
+    """Casefolded literals at least one of which occurs on every line the pattern matches
+
+    Returns None when no such set can be derived (e.g. the pattern is all
+    character classes). Of the candidate sets, the one whose shortest literal is
+    longest is picked, since it lets the fewest lines through.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+    literals = _required_literals(parsed, bool(parsed.state.flags & re.IGNORECASE))
+    return frozenset(literals) if literals else None
+
+
+def _required_literals(parsed: Sequence[Tuple[int, object]], ignore_case: bool) -> Optional[set]:
+    """Literal set of a parsed (sub)pattern, see required_literals"""
+    candidates = []
+    run = []
+    for op, av in list(parsed) + [(None, None)]:
+        if op is sre_parse.LITERAL and av != ord('\n'):
+            run.append(chr(av))
+            continue
+        # Case-insensitive matching of non-ASCII letters doesn't reduce to casefolding
+        literal = ''.join(run)
+        if literal and (literal.isascii() or not ignore_case):
+            candidates.append({fold_case(literal)})
+        run = []
+        
+        # Only parts every match must go through can contribute
+        required = None
+        if op is sre_parse.SUBPATTERN:
+            add_flags, del_flags = av[1], av[2]
+            group_ignore_case = (ignore_case or bool(add_flags & re.IGNORECASE)) and not del_flags & re.IGNORECASE
+            required = _required_literals(av[-1], group_ignore_case)
+        elif op is sre_parse.BRANCH:
+            branches = [_required_literals(branch, ignore_case) for branch in av[1]]
+            if all(branches):
+                required = set().union(*branches)
+        elif op in _REPEATS and av[0] >= 1:
+            required = _required_literals(av[2], ignore_case)
+        elif op is _ATOMIC_GROUP:
+            required = _required_literals(av, ignore_case)
+        if required:
+            candidates.append(required)
+    
+    if not candidates:
+        return None
+    return max(candidates, key=lambda literals: (min(map(len, literals)), -len(literals)))
+
+
+# Repeat and atomic group opcodes (possessive repeats and atomic groups are Python 3.11+)
+_REPEATS = tuple(
+    op for op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', None))
+    if op is not None
+)
+_ATOMIC_GROUP = getattr(sre_parse, 'ATOMIC_GROUP', None)
+
+
+class LineScanner:
+    """Matches many line rules with one pass over the whole content
+
+    All rules are compiled into a single alternation that only locates candidate
+    lines; each candidate line is then checked against the individual rules, so
+    the hits are exactly those of matching every rule against every line. When
+    every rule starts with an ASCII literal, ASCII content is prefiltered with a
+    case-sensitive alternation of those literals over the lowercased text, which
+    keeps the regex engine's literal-prefix fast path. Non-ASCII prefixes are left
+    to the full scan, since case-insensitive matching can pair them with ASCII text.
+    Rules must be safe to join into one alternation: no global inline flags, group
+    names or numbered backreferences.
+    """
+    
+    def __init__(self, rules: Sequence[LineRule]):
+        self.rules = tuple(rules)
+        self._patterns = [re.compile(rule.pattern, rule.flags) for rule in self.rules]
+        self._scanner = re.compile(
+            '|'.join(
+                f"(?{'i' if rule.flags & re.IGNORECASE else ''}:{rule.pattern})" for rule in self.rules
+            ),
+            re.MULTILINE
+        )
+        
+        prefixes = [literal_prefix(rule.pattern, rule.flags).lower() for rule in self.rules]
+        self._prefilter = None
+        if prefixes and all(prefix and prefix.isascii() for prefix in prefixes):
+            self._prefilter = re.compile('|'.join(re.escape(prefix) for prefix in dict.fromkeys(prefixes)))
+        
+        # Hits are ordered by rule group (consecutive rules sharing a rule_id), then line
+        self._groups = []
+        for index, rule in enumerate(self.rules):
+            if index and rule.rule_id == self.rules[index - 1].rule_id:
+                self._groups.append(self._groups[-1])
+            else:
+                self._groups.append(index)
+    
+    def candidate_lines(self, content: str, offsets: Sequence[int]) -> List[int]:
+        """Find the (1-based) lines on which any rule may match"""
+        scanner = self._scanner
+        if self._prefilter is not None and content.isascii():
+            # Lowercasing ASCII keeps every offset, so the line index still applies
+            scanner, content = self._prefilter, content.lower()
+        
+        candidates = []
+        position = 0
+        while True:
+            match = scanner.search(content, position)
+            if match is None:
+                break
+            
+            # Continue from the next line, so one match never hides a later line
+            line_number = bisect_right(offsets, match.start())
+            candidates.append(line_number)
+            if line_number >= len(offsets):
+                break
+            position = offsets[line_number]
+        return candidates
+    
+    def scan(self, content: str, lines: Optional[Sequence[str]] = None,
+             line_filter: Optional[Container[int]] = None,
+             offsets: Optional[Sequence[int]] = None) -> List[Tuple[LineRule, int, str]]:
+        """Return (rule, line_number, line) for every rule match, grouped by rule"""
+        if not self.rules:
+            return []
+        if lines is None:
+            lines = content.split('\n')
+        if offsets is None:
+            offsets = line_offsets(content)
+        
+        hits = []
+        for line_number in self.candidate_lines(content, offsets):
+            if line_filter is not None and line_number not in line_filter:
+                continue
+            
+            line = lines[line_number - 1]
+            for index, pattern in enumerate(self._patterns):
+                if pattern.search(line):
+                    hits.append((self._groups[index], line_number, index))
+        
+        hits.sort()
+        return [(self.rules[index], line_number, lines[line_number - 1]) for _, line_number, index in hits]
@@ -0,0 +1,77 @@
+"""
+Shared, lazily computed views of a file's source
+"""
+
+import ast
+import io
+import tokenize
+from functools import cached_property
+from typing import List, Tuple, Optional
+
+
+def line_offsets(content: str) -> List[int]:
+    """Start offset of every line in content"""
+    offsets = [0]
+    position = content.find('\n')
+    while position != -1:
+        offsets.append(position + 1)
+        position = content.find('\n', position + 1)
+    return offsets
+
+
+class SourceView:
+    """The artifacts analyzers derive from a file's text, each computed at most once
+
+    The agent builds one view per file and shares it with every analyzer through
+    AnalysisContext.source. Lines and offsets are tuples; the AST and tokens are
+    shared too, so analyzers must treat them as read-only. Only the text is
+    pickled, the rest is recomputed on demand in the receiving process.
+    """
+    
+    def __init__(self, text: str):
+        self._text = text
+    
+    def __reduce__(self):
+        return (self.__class__, (self._text,))
+    
+    @property
+    def text(self) -> str:
+        return self._text
+    
+    @cached_property
+    def lines(self) -> Tuple[str, ...]:
+        """Lines split on '\\n', without their line endings"""
+        return tuple(self._text.split('\n'))
+    
+    @cached_property
+    def offsets(self) -> Tuple[int, ...]:
+        """Start offset of every line"""
+        return tuple(line_offsets(self._text))
+    
+    @cached_property
+    def _parsed(self) -> Tuple[Optional[ast.AST], Optional[SyntaxError]]:
+        try:
+            return ast.parse(self._text), None
+        except SyntaxError as e:
+            return None, e
+    
+    @property
+    def tree(self) -> Optional[ast.AST]:
+        """The parsed module, or None if the text is not valid Python"""
+        return self._parsed[0]
+    
+    @property
+    def syntax_error(self) -> Optional[SyntaxError]:
+        """Why the text failed to parse, if it did"""
+        return self._parsed[1]
+    
+    @cached_property
+    def tokens(self) -> Tuple[tokenize.TokenInfo, ...]:
+        """Python tokens of the text (those before the first tokenize error)"""
+        tokens = []
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(self._text).readline):
+                tokens.append(token)
+        except (tokenize.TokenError, SyntaxError):
+            pass
+        return tuple(tokens)
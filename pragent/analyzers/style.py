@@ -2,13 +2,15 @@
 Code style analyzer using black, isort, and custom style checks
 """
 
-import subprocess
-import tempfile
-import os
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-from .base import Analyzer, AnalysisResult, Issue, IssueSeverity, IssueType
+from . import backends
+from .formatting import format_hunks
+from .subprocesses import run_tool
+from .base import Analyzer, AnalysisContext, AnalysisResult, Issue, IssueSeverity, IssueType, iter_lines
+from .rules import run_shared_rules
+from .source import SourceView
 
 
 class StyleAnalyzer(Analyzer):
@@ -21,23 +23,37 @@ class StyleAnalyzer(Analyzer):
         self.max_line_length = config.get('max_line_length', 88)
         self.require_docstrings = config.get('require_docstrings', False)
     
-    async def analyze(self, file_path: str, content: str) -> AnalysisResult:
+    async def analyze(self, file_path: str, content: str,
+                      context: Optional[AnalysisContext] = None) -> AnalysisResult:
         """Analyze code style"""
         issues = []
         metrics = {}
+        complete = True
+        
+        run_tools = not self._is_stage_skipped('tools', context)
         
         # Run black if enabled and file is Python
-        if self.enable_black and file_path.endswith('.py'):
-            black_issues = await self._run_black(file_path, content)
-            issues.extend(black_issues)
+        if self.enable_black and file_path.endswith('.py') and run_tools:
+            black_issues = None
+            if self._tool_available('black'):
+                black_issues = await self._run_tool_stage(self._run_black(file_path, content, context), context)
+            if black_issues is None:
+                complete = False
+            else:
+                issues.extend(black_issues)
         
         # Run isort if enabled and file is Python
-        if self.enable_isort and file_path.endswith('.py'):
-            isort_issues = await self._run_isort(file_path, content)
-            issues.extend(isort_issues)
+        if self.enable_isort and file_path.endswith('.py') and run_tools:
+            isort_issues = None
+            if self._tool_available('isort'):
+                isort_issues = await self._run_tool_stage(self._run_isort(file_path, content, context), context)
+            if isort_issues is None:
+                complete = False
+            else:
+                issues.extend(isort_issues)
         
         # Custom style checks
-        custom_issues = self._custom_style_checks(file_path, content)
+        custom_issues, _ = await self._run_cpu_stage(file_path, content, context)
         issues.extend(custom_issues)
         
         # Calculate style score
@@ -52,118 +68,111 @@ class StyleAnalyzer(Analyzer):
             issues=issues,
             metrics=metrics,
             score=score,
-            summary=summary
+            summary=summary,
+            complete=complete
         )
     
-    async def _run_black(self, file_path: str, content: str) -> List[Issue]:
-        """Run black formatting check"""
+    def analyze_cpu(self, file_path: str, content: str,
+                    context: Optional[AnalysisContext] = None) -> Tuple[List[Issue], Dict[str, Any]]:
+        """Run the custom style checks"""
+        return self._custom_style_checks(file_path, content, context), {}
+    
+    def get_shared_rules(self) -> Dict[str, Dict[str, Any]]:
+        """Get the shared rules in use"""
+        return {'line-too-long': {'max_line_length': self.max_line_length}}
+    
+    def get_required_tools(self) -> List[str]:
+        """Get the external tools in use"""
+        return (['black'] if self.enable_black else []) + (['isort'] if self.enable_isort else [])
+    
+    def get_inprocess_tools(self) -> List[str]:
+        """Get the tools run through their Python APIs"""
+        return self.get_required_tools() if self.tool_backend == 'inprocess' else []
+    
+    async def _run_black(self, file_path: str, content: str,
+                        context: Optional[AnalysisContext] = None) -> Optional[List[Issue]]:
+        """Run black formatting check, returning None if black failed"""
         issues = []
         
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(content)
-                temp_file = f.name
-            
-            # Run black in check mode
-            result = subprocess.run([
-                'black', '--check', '--diff', temp_file
-            ], capture_output=True, text=True, timeout=30)
+            if self.tool_backend == 'inprocess':
+                formatted = await self._call_tool(backends.black_format, content)
+            else:
+                # Format the content piped over stdin; black exits non-zero if it can't parse it
+                result = await run_tool(['black', '-q', '-'], timeout=30, input=content)
+                formatted = result.stdout if result.returncode == 0 else content
             
-            # If black suggests changes, create issues
-            if result.returncode != 0 and result.stdout:
-                # Parse diff output to find specific lines
-                diff_lines = result.stdout.split('\n')
-                current_line = 0
-                
-                for line in diff_lines:
-                    if line.startswith('@@'):
-                        # Parse line numbers from diff
-                        match = re.search(r'\+(\d+)', line)
-                        if match:
-                            current_line = int(match.group(1))
-                    elif line.startswith('+') and not line.startswith('+++'):
-                        issues.append(self._create_issue(
-                            file_path=file_path,
-                            line_number=current_line,
-                            severity=IssueSeverity.LOW,
-                            issue_type=IssueType.STYLE,
-                            message="Code formatting issue detected by black",
-                            rule_id="black-formatting",
-                            suggestion="Run 'black' to format this code",
-                            code_snippet=line[1:].strip()
-                        ))
-                        current_line += 1
-                    elif line.startswith('-') and not line.startswith('---'):
-                        current_line += 1
-            
-            # Clean up
-            os.unlink(temp_file)
+            issues = self._create_format_issues(
+                file_path, content, formatted,
+                message="Code formatting issue detected by black",
+                rule_id="black-formatting",
+                suggestion="Run 'black' to format this code"
+            )
             
         except Exception as e:
-            # If black fails, continue without it
-            pass
+            # If black fails, record why and continue without it
+            self._record_tool_failure('black', e, file_path, context)
+            return None
         
         return issues
     
-    async def _run_isort(self, file_path: str, content: str) -> List[Issue]:
-        """Run isort import sorting check"""
+    async def _run_isort(self, file_path: str, content: str,
+                        context: Optional[AnalysisContext] = None) -> Optional[List[Issue]]:
+        """Run isort import sorting check, returning None if isort failed"""
         issues = []
         
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(content)
-                temp_file = f.name
-            
-            # Run isort in check mode
-            result = subprocess.run([
-                'isort', '--check-only', '--diff', temp_file
-            ], capture_output=True, text=True, timeout=30)
-            
-            # If isort suggests changes, create issues
-            if result.returncode != 0 and result.stdout:
-                # Parse diff output
-                diff_lines = result.stdout.split('\n')
-                current_line = 0
-                
-                for line in diff_lines:
-                    if line.startswith('@@'):
-                        # Parse line numbers from diff
-                        match = re.search(r'\+(\d+)', line)
-                        if match:
-                            current_line = int(match.group(1))
-                    elif line.startswith('+') and not line.startswith('+++'):
-                        issues.append(self._create_issue(
-                            file_path=file_path,
-                            line_number=current_line,
-                            severity=IssueSeverity.LOW,
-                            issue_type=IssueType.STYLE,
-                            message="Import sorting issue detected by isort",
-                            rule_id="isort-imports",
-                            suggestion="Run 'isort' to sort imports",
-                            code_snippet=line[1:].strip()
-                        ))
-                        current_line += 1
-                    elif line.startswith('-') and not line.startswith('---'):
-                        current_line += 1
+            if self.tool_backend == 'inprocess':
+                formatted = await self._call_tool(backends.isort_format, content)
+            else:
+                # Sort the content piped over stdin
+                result = await run_tool(['isort', '-q', '-'], timeout=30, input=content)
+                formatted = result.stdout if result.returncode == 0 else content
             
-            # Clean up
-            os.unlink(temp_file)
+            issues = self._create_format_issues(
+                file_path, content, formatted,
+                message="Import sorting issue detected by isort",
+                rule_id="isort-imports",
+                suggestion="Run 'isort' to sort imports"
+            )
             
         except Exception as e:
-            # If isort fails, continue without it
-            pass
+            # If isort fails, record why and continue without it
+            self._record_tool_failure('isort', e, file_path, context)
+            return None
         
         return issues
     
-    def _custom_style_checks(self, file_path: str, content: str) -> List[Issue]:
+    def _create_format_issues(self, file_path: str, content: str, formatted: str,
+                              message: str, rule_id: str, suggestion: str) -> List[Issue]:
+        """Create one issue per contiguous block of lines the formatter would change"""
+        issues = []
+        
+        for hunk in format_hunks(content, formatted):
+            snippet = next((line.strip() for line in hunk.formatted + hunk.original if line.strip()), None)
+            issues.append(self._create_issue(
+                file_path=file_path,
+                line_number=hunk.start_line,
+                end_line_number=hunk.end_line,
+                severity=IssueSeverity.LOW,
+                issue_type=IssueType.STYLE,
+                message=message,
+                rule_id=rule_id,
+                suggestion=suggestion,
+                code_snippet=snippet
+            ))
+        
+        return issues
+    
+    def _custom_style_checks(self, file_path: str, content: str,
+                             context: Optional[AnalysisContext] = None) -> List[Issue]:
         """Custom style checks"""
         issues = []
-        lines = content.split('\n')
+        source = self._get_source(content, context)
+        lines = source.lines
         
         # Check for trailing whitespace
-        for i, line in enumerate(lines, 1):
+        for i, line in iter_lines(lines, context):
             if line.rstrip() != line:
                 issues.append(self._create_issue(
                     file_path=file_path,
@@ -178,7 +187,7 @@ class StyleAnalyzer(Analyzer):
         
         # Check for inconsistent indentation
         indentations = []
-        for i, line in enumerate(lines, 1):
+        for i, line in iter_lines(lines, context):
             if line.strip():  # Non-empty line
                 indent = len(line) - len(line.lstrip())
                 indentations.append((i, indent, line))
@@ -201,34 +210,23 @@ class StyleAnalyzer(Analyzer):
         
         # Check for missing docstrings (if required)
         if self.require_docstrings and file_path.endswith('.py'):
-            docstring_issues = self._check_docstrings(file_path, content)
+            docstring_issues = self._check_docstrings(file_path, source)
             issues.extend(docstring_issues)
         
-        # Check for long lines
-        for i, line in enumerate(lines, 1):
-            if len(line) > self.max_line_length:
-                issues.append(self._create_issue(
-                    file_path=file_path,
-                    line_number=i,
-                    severity=IssueSeverity.LOW,
-                    issue_type=IssueType.STYLE,
-                    message=f"Line too long: {len(line)} characters",
-                    rule_id="line-too-long",
-                    suggestion=f"Break this line into multiple lines (max {self.max_line_length} characters)",
-                    code_snippet=line.strip()
-                ))
+        # Check for long lines, unless the agent runs it once for all analyzers
+        issues.extend(run_shared_rules(self, file_path, source, context))
         
         # Check for unused imports (basic check)
         if file_path.endswith('.py'):
-            unused_import_issues = self._check_unused_imports(file_path, content)
+            unused_import_issues = self._check_unused_imports(file_path, source)
             issues.extend(unused_import_issues)
         
         return issues
     
-    def _check_docstrings(self, file_path: str, content: str) -> List[Issue]:
+    def _check_docstrings(self, file_path: str, source: SourceView) -> List[Issue]:
         """Check for missing docstrings"""
         issues = []
-        lines = content.split('\n')
+        lines = source.lines
         
         # Simple check for function/class definitions without docstrings
         in_function = False
@@ -286,10 +284,10 @@ class StyleAnalyzer(Analyzer):
         
         return issues
     
-    def _check_unused_imports(self, file_path: str, content: str) -> List[Issue]:
+    def _check_unused_imports(self, file_path: str, source: SourceView) -> List[Issue]:
         """Basic check for unused imports"""
         issues = []
-        lines = content.split('\n')
+        lines = source.lines
         
         # Find import statements
         imports = []
@@ -313,7 +311,7 @@ class StyleAnalyzer(Analyzer):
                             imports.append((i, name))
         
         # Check if imports are used
-        content_lower = content.lower()
+        content_lower = source.text.lower()
         for line_num, import_name in imports:
             # Simple check - look for the import name in the code
             if import_name not in content_lower or f'import {import_name}' in content_lower:
@@ -0,0 +1,142 @@
+"""
+Non-blocking execution of external analysis tools
+"""
+
+import asyncio
+import os
+import shutil
+import signal
+import subprocess
+import weakref
+from typing import List, Optional
+
+
+# Upper bound on tool processes running at once, shared by all analyzers
+_max_concurrent_tools = os.cpu_count() or 1
+
+# Resource limits applied to each tool process (None for no limit)
+_cpu_limit: Optional[int] = None
+_memory_limit: Optional[int] = None
+
+# asyncio semaphores are bound to a loop, so keep one per running loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+class ToolError(Exception):
+    """A tool run that failed for a known reason"""
+    
+    def __init__(self, tool: str, reason: str, detail: str = ''):
+        super().__init__(f"{tool}: {reason}" + (f" ({detail})" if detail else ''))
+        self.tool = tool
+        self.reason = reason
+        self.detail = detail
+    
+    def __reduce__(self):
+        # Rebuild from the fields, so tool workers can send it back over their pipe
+        return (ToolError, (self.tool, self.reason, self.detail))
+
+
+def set_tool_concurrency(limit: Optional[int]) -> None:
+    """Set how many tool processes may run at once (defaults to the CPU count)"""
+    global _max_concurrent_tools
+    _max_concurrent_tools = limit or os.cpu_count() or 1
+    _semaphores.clear()
+
+
+def set_tool_limits(cpu_seconds: Optional[int] = None, memory_bytes: Optional[int] = None) -> None:
+    """Set the CPU-time and address-space limits for tool processes"""
+    global _cpu_limit, _memory_limit
+    _cpu_limit = cpu_seconds
+    _memory_limit = memory_bytes
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Get the tool semaphore for the running loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_max_concurrent_tools)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+def _limited_command(args: List[str], cpu_seconds: Optional[int], memory_bytes: Optional[int]) -> List[str]:
+    """Wrap a command in a shell that sets the rlimits and then execs the tool
+
+    preexec_fn can deadlock the child when the agent has threads running (tool
+    worker dispatchers, executors), so a shell sets them before it execs the tool.
+    """
+    limits = []
+    if cpu_seconds:
+        # SIGXCPU at the soft limit, SIGKILL shortly after if it is ignored
+        limits.append(f'ulimit -H -t {cpu_seconds + 5}; ulimit -S -t {cpu_seconds}')
+    if memory_bytes:
+        limits.append(f'ulimit -v {memory_bytes // 1024}')
+    return ['/bin/sh', '-c', '; '.join(limits) + '; exec "$@"', args[0], *args]
+
+
+def _check_result(tool: str, returncode: int, stderr: str) -> None:
+    """Raise a ToolError if the process died abnormally (plain non-zero exits are tool findings)"""
+    if returncode >= 0:
+        if 'MemoryError' in stderr or 'memory allocation' in stderr.lower():
+            raise ToolError(tool, 'memory-limit', stderr.strip().splitlines()[-1])
+        return
+    
+    signal_number = -returncode
+    if signal_number == signal.SIGXCPU or (signal_number == signal.SIGKILL and _cpu_limit):
+        raise ToolError(tool, 'cpu-limit', f"killed by signal {signal_number}")
+    if signal_number in (signal.SIGSEGV, signal.SIGABRT) and _memory_limit:
+        raise ToolError(tool, 'memory-limit', f"killed by signal {signal_number}")
+    raise ToolError(tool, 'killed', f"killed by signal {signal_number}")
+
+
+async def run_tool(args: List[str], timeout: Optional[float] = None,
+                   input: Optional[str] = None, cwd: Optional[str] = None,
+                   limit_resources: bool = True) -> subprocess.CompletedProcess:
+    """Run a tool without blocking the event loop, killing it if it overruns its timeout
+
+    Raises ToolError when the tool is missing, times out or dies abnormally.
+    """
+    tool = os.path.basename(args[0])
+    cpu_seconds, memory_bytes = (_cpu_limit, _memory_limit) if limit_resources else (None, None)
+    command = args
+    if cpu_seconds or memory_bytes:
+        # The shell would report a missing tool as exit 127, so look it up first
+        executable = shutil.which(args[0])
+        if executable is None:
+            raise ToolError(tool, 'missing', f"{args[0]} not found")
+        command = _limited_command([executable, *args[1:]], cpu_seconds, memory_bytes)
+    
+    async with _get_semaphore():
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=cwd
+            )
+        except FileNotFoundError as e:
+            raise ToolError(tool, 'missing', str(e)) from e
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(input.encode('utf-8') if input is not None else None),
+                timeout
+            )
+        except BaseException as e:
+            # Timed out or cancelled: don't leave the child running
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            if isinstance(e, asyncio.TimeoutError):
+                raise ToolError(tool, 'timeout', f"no result after {timeout}s") from e
+            raise
+    
+    result = subprocess.CompletedProcess(
+        args, process.returncode,
+        stdout.decode('utf-8', errors='replace'),
+        stderr.decode('utf-8', errors='replace')
+    )
+    _check_result(tool, result.returncode, result.stderr)
+    return result
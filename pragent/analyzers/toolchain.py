@@ -0,0 +1,146 @@
+"""
+Registry of the external analysis tools: availability, versions and failures
+"""
+
+import importlib.metadata
+import importlib.util
+import re
+import shutil
+import subprocess
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Iterable
+
+
+# Command used to probe each tool's version
+VERSION_COMMANDS = {
+    'pylint': ['pylint', '--version'],
+    'bandit': ['bandit', '--version'],
+    'black': ['black', '--version'],
+    'isort': ['isort', '--version-number'],
+    'ruff': ['ruff', '--version'],
+    'dmypy': ['dmypy', '--version']
+}
+
+VERSION_PATTERN = re.compile(r'\d+\.\d+(?:\.\d+)?')
+
+# Module each in-process backend imports, probed instead of the CLI for that backend
+INPROCESS_MODULES = {
+    'pylint': 'pylint.lint',
+    'bandit': 'bandit.core.manager',
+    'black': 'black',
+    'isort': 'isort'
+}
+
+
+@dataclass
+class ToolStatus:
+    """Result of probing one tool"""
+    name: str
+    available: bool
+    version: Optional[str] = None
+    path: Optional[str] = None
+    reason: Optional[str] = None  # why the tool is unavailable: missing, broken
+
+
+@dataclass
+class ToolFailure:
+    """One failed tool run"""
+    tool: str
+    reason: str  # missing, timeout, cpu-limit, memory-limit, killed, bad-output, error
+    detail: str
+    file_path: Optional[str] = None
+
+
+class Toolchain:
+    """Probes tools once and records why their runs fail"""
+    
+    def __init__(self, max_failures: int = 100):
+        self.statuses: Dict[str, ToolStatus] = {}
+        self.failure_counts: Counter = Counter()
+        self.recent_failures: deque = deque(maxlen=max_failures)
+        self._lock = threading.Lock()
+    
+    def probe(self, tools: Iterable[str], inprocess: Iterable[str] = ()) -> Dict[str, ToolStatus]:
+        """Probe the given tools concurrently for presence and version
+        
+        Tools listed in inprocess run through their Python APIs, so their module
+        is looked up instead of their command.
+        """
+        inprocess = set(inprocess)
+        tools = [tool for tool in dict.fromkeys(tools) if tool not in self.statuses]
+        if tools:
+            with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+                for status in executor.map(
+                    lambda tool: self._probe_module(tool) if tool in inprocess else self._probe_tool(tool), tools
+                ):
+                    self.statuses[status.name] = status
+        return self.statuses
+    
+    def _probe_tool(self, tool: str) -> ToolStatus:
+        """Locate a tool and ask it for its version"""
+        command = VERSION_COMMANDS.get(tool, [tool, '--version'])
+        path = shutil.which(command[0])
+        if path is None:
+            return ToolStatus(tool, available=False, reason='missing')
+        
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.SubprocessError) as e:
+            return ToolStatus(tool, available=False, path=path, reason=f'broken: {e}')
+        
+        if result.returncode != 0:
+            detail = (result.stderr or result.stdout).strip().splitlines()[-1:] or ['']
+            return ToolStatus(tool, available=False, path=path, reason=f'broken: {detail[0]}')
+        
+        match = VERSION_PATTERN.search(result.stdout or result.stderr)
+        return ToolStatus(tool, available=True, version=match.group(0) if match else None, path=path)
+    
+    def _probe_module(self, tool: str) -> ToolStatus:
+        """Locate the module an in-process backend imports and get its package version"""
+        try:
+            spec = importlib.util.find_spec(INPROCESS_MODULES.get(tool, tool))
+        except (ImportError, ValueError) as e:
+            return ToolStatus(tool, available=False, reason=f'broken: {e}')
+        if spec is None:
+            return ToolStatus(tool, available=False, reason='missing')
+        
+        try:
+            version = importlib.metadata.version(tool)
+        except importlib.metadata.PackageNotFoundError:
+            version = None
+        return ToolStatus(tool, available=True, version=version, path=spec.origin)
+    
+    def is_available(self, tool: str) -> bool:
+        """Tools that were never probed are assumed to be available"""
+        status = self.statuses.get(tool)
+        return status is None or status.available
+    
+    def versions(self, tools: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Get the probed version of each tool (None if unknown)"""
+        return {tool: self.statuses[tool].version if tool in self.statuses else None for tool in tools}
+    
+    def record_failure(self, failure: ToolFailure) -> None:
+        """Record a failed tool run"""
+        with self._lock:
+            self.failure_counts[(failure.tool, failure.reason)] += 1
+            self.recent_failures.append(failure)
+    
+    def report(self, failures: Optional[List[ToolFailure]] = None) -> Dict[str, Any]:
+        """Summarize tool availability and failures (the given ones, or all since startup)"""
+        with self._lock:
+            if failures is None:
+                failure_counts, recent_failures = dict(self.failure_counts), list(self.recent_failures)
+            else:
+                failure_counts = Counter((failure.tool, failure.reason) for failure in failures)
+                recent_failures = failures[-self.recent_failures.maxlen:]
+            return {
+                'tools': {name: asdict(status) for name, status in self.statuses.items()},
+                'failures': [
+                    {'tool': tool, 'reason': reason, 'count': count}
+                    for (tool, reason), count in sorted(failure_counts.items())
+                ],
+                'recent_failures': [asdict(failure) for failure in recent_failures]
+            }
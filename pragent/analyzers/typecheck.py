@@ -0,0 +1,205 @@
+"""
+Type checking analyzer using the mypy daemon (dmypy)
+"""
+
+import ast
+import asyncio
+import os
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from .subprocesses import ToolError, run_tool
+from .base import Analyzer, AnalysisContext, AnalysisResult, Issue, IssueSeverity, IssueType
+
+
+# file:line:column:end_line:end_column: severity: message  [code]
+MYPY_MESSAGE = re.compile(
+    r'^(?P<path>[^:\n]+):(?P<line>\d+):(?:(?P<column>\d+):)?(?:(?P<end_line>\d+):(?P<end_column>\d+):)?'
+    r' (?P<severity>error|warning|note): (?P<message>.*?)(?:  \[(?P<code>[\w-]+)\])?$'
+)
+
+# Output options the parser above depends on
+MYPY_OUTPUT_OPTIONS = [
+    '--show-column-numbers', '--show-error-end', '--no-error-summary',
+    '--hide-error-context', '--no-color-output', '--no-pretty'
+]
+
+# Map paths to modules from the tree root, since PR files rarely come with their __init__.py
+MYPY_MODULE_OPTIONS = ['--explicit-package-bases']
+
+
+class TypeCheckAnalyzer(Analyzer):
+    """Type checking analyzer backed by one incremental mypy daemon per repository"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.enable_mypy = config.get('enable_mypy', False)
+        self.cache_dir = Path(config.get('mypy_cache_dir', '~/.cache/pragent/mypy')).expanduser()
+        self.mypy_options = config.get('mypy_options', ['--ignore-missing-imports'])
+        self.idle_timeout = config.get('mypy_idle_timeout', 600)
+        self._repo_locks: Dict[str, asyncio.Lock] = {}
+        self._daemons: Dict[str, Path] = {}
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        state['_repo_locks'] = {}
+        return state
+    
+    async def analyze(self, file_path: str, content: str,
+                      context: Optional[AnalysisContext] = None) -> AnalysisResult:
+        """Type checking runs once per PR in analyze_batch"""
+        return AnalysisResult(
+            file_path=file_path,
+            issues=[],
+            metrics={},
+            score=100.0,
+            summary="Type checked per PR"
+        )
+    
+    def get_required_tools(self) -> List[str]:
+        """Get the external tools in use"""
+        return ['dmypy'] if self.enable_mypy else []
+    
+    def has_batch_stage(self, context: Optional[AnalysisContext] = None) -> bool:
+        """dmypy checks all changed files of a PR at once"""
+        return (self.enable_mypy and not self._is_stage_skipped('tools', context)
+                and self._tool_available('dmypy'))
+    
+    async def analyze_batch(self, files: Dict[str, str],
+                            context: Optional[AnalysisContext] = None) -> Dict[str, List[Issue]]:
+        """Type check the changed Python files of a PR with the repository's mypy daemon
+
+        Files are kept in a persistent per-repository tree so that the daemon only
+        re-analyzes modules affected by what changed since the previous check. The
+        tree is reset to this PR's files first, so no PR is checked against files
+        another PR or branch left behind.
+        """
+        python_files = {path: content for path, content in files.items() if path.endswith('.py')}
+        if not python_files:
+            return {}
+        
+        # A syntax error blocks mypy for every file; other analyzers report it
+        checked_files = {path: content for path, content in python_files.items() if self._parses(content)}
+        
+        repo = context.repo if context is not None and context.repo else 'default'
+        repo_dir = self.cache_dir / re.sub(r'[^\w.-]', '_', repo)
+        source_dir = repo_dir / 'src'
+        issues = {file_path: [] for file_path in python_files}
+        
+        # One check at a time per repository, since checks share the source tree
+        lock = self._repo_locks.setdefault(repo, asyncio.Lock())
+        async with lock:
+            try:
+                source_dir.mkdir(parents=True, exist_ok=True)
+                source_paths = self._update_sources(source_dir, checked_files)
+                self._prune_sources(source_dir, source_paths)
+                if not source_paths:
+                    return issues
+                
+                # dmypy run starts the daemon if needed and restarts it when the options change
+                self._daemons[repo] = repo_dir
+                result = await run_tool([
+                    'dmypy', '--status-file', str(repo_dir / 'dmypy.json'),
+                    'run', '--timeout', str(self.idle_timeout), '--',
+                    *self.mypy_options, *MYPY_OUTPUT_OPTIONS, *MYPY_MODULE_OPTIONS,
+                    '--cache-dir', str(repo_dir / 'cache'),
+                    *source_paths
+                ], timeout=300, cwd=str(source_dir), limit_resources=False)
+                
+                # mypy exits 1 when it found errors; anything else means it could not check the files
+                if result.returncode not in (0, 1):
+                    output = (result.stderr or result.stdout).strip().splitlines()
+                    raise ToolError('dmypy', 'error', output[-1] if output else f"exit code {result.returncode}")
+                
+                # Map messages back to the original file paths
+                for line in result.stdout.splitlines():
+                    match = MYPY_MESSAGE.match(line)
+                    if match is None or match.group('severity') == 'note':
+                        continue
+                    file_path = source_paths.get(os.path.normpath(match.group('path')))
+                    if file_path is not None:
+                        issues[file_path].append(self._create_mypy_issue(file_path, match))
+            
+            except Exception as e:
+                # If dmypy fails, record why and continue without it
+                self._record_tool_failure('dmypy', e, context=context)
+        
+        return issues
+    
+    def _parses(self, content: str) -> bool:
+        """Check whether content is syntactically valid Python"""
+        try:
+            ast.parse(content)
+        except (SyntaxError, ValueError):
+            return False
+        return True
+    
+    def _update_sources(self, source_dir: Path, files: Dict[str, str]) -> Dict[str, str]:
+        """Write changed files into the repository tree, leaving unchanged ones untouched"""
+        source_paths = {}
+        for file_path, content in files.items():
+            relative_path = os.path.normpath(file_path.lstrip('/'))
+            if relative_path.startswith('..'):
+                continue
+            
+            # Rewriting identical content would bump the mtime and force a re-check
+            target = source_dir / relative_path
+            try:
+                unchanged = target.read_text(encoding='utf-8') == content
+            except (OSError, UnicodeDecodeError):
+                unchanged = False
+            if not unchanged:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(content, encoding='utf-8')
+            
+            source_paths[relative_path] = file_path
+        return source_paths
+    
+    def _prune_sources(self, source_dir: Path, source_paths: Dict[str, str]) -> None:
+        """Delete the files (and emptied directories) of the tree that are not in source_paths"""
+        for root, dirs, files in os.walk(source_dir, topdown=False):
+            for name in files:
+                path = Path(root) / name
+                if os.path.normpath(path.relative_to(source_dir)) not in source_paths:
+                    path.unlink()
+            for name in dirs:
+                try:
+                    (Path(root) / name).rmdir()
+                except OSError:
+                    pass  # not empty
+    
+    def _create_mypy_issue(self, file_path: str, match: 're.Match[str]') -> Issue:
+        """Convert a mypy message into an issue"""
+        severity = IssueSeverity.HIGH if match.group('severity') == 'error' else IssueSeverity.MEDIUM
+        end_line = match.group('end_line')
+        column = match.group('column')
+        
+        return self._create_issue(
+            file_path=file_path,
+            line_number=int(match.group('line')),
+            end_line_number=int(end_line) if end_line else None,
+            severity=severity,
+            issue_type=IssueType.BUG,
+            message=match.group('message'),
+            rule_id=match.group('code') or 'mypy',
+            suggestion="Fix the type error or add a precise annotation",
+            column_number=int(column) if column else None
+        )
+    
+    async def close(self) -> None:
+        """Stop the mypy daemons started by this analyzer"""
+        for repo_dir in self._daemons.values():
+            try:
+                await run_tool(
+                    ['dmypy', '--status-file', str(repo_dir / 'dmypy.json'), 'stop'],
+                    timeout=30, limit_resources=False
+                )
+            except Exception:
+                # The daemon shuts itself down after the idle timeout anyway
+                pass
+        self._daemons.clear()
+    
+    def get_supported_extensions(self) -> List[str]:
+        """Get supported file extensions"""
+        return ['.py']
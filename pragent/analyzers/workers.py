@@ -0,0 +1,295 @@
+"""
+Long-lived tool worker pool
+
+Each worker is a separate process with the tools pre-imported. Jobs and results
+travel over a pipe, and a worker retires itself after a number of jobs or once its
+memory grows past a ceiling, so tool state and leaks never pile up in the agent.
+A job that overruns its deadline, or whose caller gives up on it, gets its worker
+killed and replaced. Workers run under the same CPU-time and address-space limits
+as tool subprocesses.
+"""
+
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Optional
+
+from .subprocesses import ToolError
+
+
+# How often a dispatcher checks a running job for its deadline or cancellation
+POLL_INTERVAL = 0.1
+
+
+def _resident_memory() -> int:
+    """Current resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Peak RSS is the best we can do without procfs (KiB on Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_time() -> float:
+    """CPU time used so far by this process in seconds"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _limit_job_cpu(cpu_limit: int) -> None:
+    """Allow the next job cpu_limit seconds of CPU (RLIMIT_CPU counts over the process's life)"""
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(_cpu_time()) + cpu_limit
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn: Any, initializer: Optional[Callable[[], None]],
+                 max_jobs: Optional[int], max_memory: Optional[int],
+                 cpu_limit: Optional[int] = None, memory_limit: Optional[int] = None) -> None:
+    """Serve jobs from the pipe until told to stop or until it is time to retire"""
+    if initializer is not None:
+        initializer()
+    if memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    
+    jobs = 0
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        
+        func, args = job
+        if cpu_limit:
+            _limit_job_cpu(cpu_limit)
+        out_of_memory = False
+        try:
+            outcome = (True, func(*args))
+        except MemoryError as e:
+            # The heap may be left fragmented or half-built, so don't reuse this worker
+            outcome = (False, ToolError(getattr(func, '__name__', 'tool'), 'memory-limit', str(e)))
+            out_of_memory = True
+        except BaseException as e:
+            outcome = (False, e)
+        
+        jobs += 1
+        retire = (
+            out_of_memory or
+            (max_jobs is not None and jobs >= max_jobs) or
+            (max_memory is not None and _resident_memory() > max_memory)
+        )
+        try:
+            conn.send(outcome + (retire,))
+        except Exception as e:
+            # The result could not be pickled; report that instead
+            conn.send((False, RuntimeError(f"Unpicklable tool result: {e}"), retire))
+        if retire:
+            break
+    
+    conn.close()
+
+
+class _JobFuture(Future):
+    """Future whose cancel() also stops the job once it is running
+    
+    A running job can't be cancelled in the worker, so cancel() still returns
+    False, but it flags the job as abandoned and the dispatcher kills the worker.
+    This is what asyncio calls when a run_in_executor awaitable is cancelled.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.abandoned = threading.Event()
+    
+    def cancel(self) -> bool:
+        if super().cancel():
+            return True
+        if self.running():
+            self.abandoned.set()
+        return False
+
+
+class ToolWorkerPool(Executor):
+    """Executor backed by persistent, self-recycling tool worker processes"""
+    
+    def __init__(self, max_workers: Optional[int] = None,
+                 initializer: Optional[Callable[[], None]] = None,
+                 max_jobs_per_worker: Optional[int] = None,
+                 max_memory_bytes: Optional[int] = None,
+                 job_timeout: Optional[float] = None,
+                 cpu_limit: Optional[int] = None,
+                 memory_limit: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initializer = initializer
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_memory_bytes = max_memory_bytes
+        self.job_timeout = job_timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+        self.recycled = 0
+        self.killed = 0
+        self._jobs: "queue.Queue[Any]" = queue.Queue()
+        self._shutdown = False
+        self._lock = threading.Lock()
+        self._threads = []
+        
+        # One dispatcher thread per worker slot; workers start lazily on first job
+        for _ in range(self.max_workers):
+            thread = threading.Thread(target=self._dispatch, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue a job for the next free worker"""
+        if kwargs:
+            raise TypeError("ToolWorkerPool jobs take positional arguments only")
+        
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new jobs after shutdown")
+            future = _JobFuture()
+            self._jobs.put((future, fn, args))
+        return future
+    
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop accepting jobs and stop the workers once the queue drains
+        
+        Running jobs still finish, but no later than their deadline.
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            
+            if cancel_futures:
+                while True:
+                    try:
+                        job = self._jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    job[0].cancel()
+            
+            for _ in self._threads:
+                self._jobs.put(None)
+        
+        if wait:
+            for thread in self._threads:
+                thread.join()
+    
+    def _start_worker(self) -> Any:
+        """Start a worker process and return (process, parent end of its pipe)"""
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(child_conn, self.initializer, self.max_jobs_per_worker, self.max_memory_bytes,
+                  self.cpu_limit, self.memory_limit),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+    
+    def _stop_worker(self, worker: Any, graceful: bool = True) -> None:
+        """Stop a worker process and release its pipe"""
+        process, conn = worker
+        if graceful:
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+        conn.close()
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+    
+    def _kill_worker(self, worker: Any) -> None:
+        """Kill a worker stuck in a job"""
+        process, conn = worker
+        process.kill()
+        process.join()
+        conn.close()
+        self.killed += 1
+    
+    def _crash_error(self, worker: Any, fn: Callable[..., Any], error: Exception) -> Exception:
+        """Explain why a stopped worker died mid-job"""
+        tool = getattr(fn, '__name__', 'tool')
+        exitcode = worker[0].exitcode
+        if exitcode is not None and exitcode < 0:
+            if -exitcode == signal.SIGXCPU:
+                return ToolError(tool, 'cpu-limit', f"killed by signal {-exitcode}")
+            return ToolError(tool, 'killed', f"killed by signal {-exitcode}")
+        return RuntimeError(f"Tool worker exited unexpectedly: {error}")
+    
+    def _wait_for_result(self, worker: Any, future: _JobFuture, fn: Callable[..., Any]) -> Optional[Any]:
+        """Wait for the worker's reply to a job, or None if the job ran out of time or was abandoned"""
+        conn = worker[1]
+        tool = getattr(fn, '__name__', 'tool')
+        deadline = time.monotonic() + self.job_timeout if self.job_timeout is not None else None
+        while not conn.poll(POLL_INTERVAL):
+            if future.abandoned.is_set():
+                future.set_exception(ToolError(tool, 'killed', "job abandoned by its caller"))
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                future.set_exception(ToolError(tool, 'timeout', f"no result after {self.job_timeout}s"))
+                return None
+        return conn.recv()
+    
+    def _dispatch(self) -> None:
+        """Feed jobs to one worker process, replacing it when it retires or dies"""
+        worker = None
+        
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            if worker is None:
+                worker = self._start_worker()
+            
+            try:
+                worker[1].send((fn, args))
+                reply = self._wait_for_result(worker, future, fn)
+                if reply is None:
+                    # The job may never return, so the worker can't be reused
+                    self._kill_worker(worker)
+                    worker = None
+                    continue
+                ok, result, retire = reply
+            except (EOFError, OSError) as e:
+                # The worker crashed mid-job (or hit its CPU limit); fail this job and start fresh
+                self._stop_worker(worker, graceful=False)
+                future.set_exception(self._crash_error(worker, fn, e))
+                worker = None
+                self.recycled += 1
+                continue
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+            
+            if retire:
+                self._stop_worker(worker, graceful=False)
+                worker = None
+                self.recycled += 1
+        
+        if worker is not None:
+            self._stop_worker(worker)
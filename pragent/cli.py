@@ -43,8 +43,9 @@ def cli(ctx, config, verbose):
 @click.option('--pr', '-p', type=int, required=True, help='Pull request number')
 @click.option('--post-comments', is_flag=True, help='Post comments to the PR')
 @click.option('--output', '-o', type=click.Path(), help='Output file path')
+@click.option('--deadline', type=float, help='Latency budget in seconds; returns a partial result when exceeded')
 @click.pass_context
-def analyze(ctx, server, repo, pr, post_comments, output):
+def analyze(ctx, server, repo, pr, post_comments, output, deadline):
     """Analyze a single pull request"""
     config = ctx.obj['config']
     
@@ -53,7 +54,7 @@ def analyze(ctx, server, repo, pr, post_comments, output):
         
         try:
             # Analyze PR
-            result = await agent.analyze_pr(server, repo, pr)
+            result = await agent.analyze_pr(server, repo, pr, deadline=deadline)
             
             # Print summary
             print(f"\nPR Analysis Complete")
@@ -61,6 +62,14 @@ def analyze(ctx, server, repo, pr, post_comments, output):
             print(f"Total Issues: {result['total_issues']}")
             print(f"Files Analyzed: {len(result['file_analyses'])}")
             
+            # Print work skipped to meet the deadline
+            if result['partial']:
+                print("\nPartial result (deadline reached):")
+                for file_path in result['skipped']['files']:
+                    print(f"  - {file_path}: not analyzed")
+                for file_path, stages in result['skipped']['analyzers'].items():
+                    print(f"  - {file_path}: skipped {', '.join(stages)}")
+            
             # Print issues by severity
             if result['issues_by_severity']:
                 print(f"\nIssues by Severity:")
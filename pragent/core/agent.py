@@ -3,14 +3,31 @@ Main PR Agent class
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+import time
+from dataclasses import replace
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from pathlib import Path
 
 from .config import Config
-from ..adapters import GitAdapter, PRInfo, GitHubAdapter, GitLabAdapter, BitbucketAdapter
-from ..analyzers import QualityAnalyzer, SecurityAnalyzer, StyleAnalyzer, AIAnalyzer, AnalysisResult
+from .budget import LatencyBudget
+from .scheduler import AnalysisScheduler
+from ..adapters import GitAdapter, PRInfo, FileChange, GitHubAdapter, GitLabAdapter, BitbucketAdapter
+from ..analyzers import (
+    QualityAnalyzer, SecurityAnalyzer, StyleAnalyzer, TypeCheckAnalyzer, CustomRuleAnalyzer, AIAnalyzer,
+    AnalysisContext, AnalysisResult
+)
+from ..analyzers.diff import ChangedLines
+from ..analyzers.rules import RulePlan
+from ..analyzers.source import SourceView
+from ..analyzers.backends import create_tool_pool
+from ..analyzers.pool import create_process_pool
+from ..analyzers.subprocesses import set_tool_concurrency, set_tool_limits
+from ..analyzers.toolchain import Toolchain
+from ..utils.cache import AnalysisCache
 from ..utils.feedback import FeedbackGenerator
+from ..utils.paths import PathMatcher
 from ..utils.report import ReportGenerator
+from ..utils.workspace import create_workspace, remove_workspace
 
 
 class PRAgent:
@@ -22,15 +39,75 @@ class PRAgent:
         self.analyzers: List[Any] = []
         self.feedback_generator = FeedbackGenerator(config)
         self.report_generator = ReportGenerator(config)
+        self.process_pool = None
+        self.tool_pool = None
+        self.cache = None
+        self.scheduler = AnalysisScheduler(
+            config.analysis.scheduler_smoothing, config.analysis.scheduler_history_file
+        )
+        self.path_matcher = PathMatcher(
+            config.analysis.include_patterns, config.analysis.exclude_patterns
+        )
         
         # Initialize analyzers
         self._initialize_analyzers()
+        set_tool_concurrency(config.analysis.max_concurrent_tools)
+        memory_limit_mb = config.analysis.tool_memory_limit_mb
+        set_tool_limits(config.analysis.tool_cpu_limit, memory_limit_mb * 1024 * 1024 if memory_limit_mb else None)
+        
+        # Probe the tools the analyzers need once (modules for in-process ones), so missing ones are skipped up front
+        self.toolchain = Toolchain()
+        self.toolchain.probe(
+            (tool for analyzer in self.analyzers for tool in analyzer.get_required_tools()),
+            inprocess=[tool for analyzer in self.analyzers for tool in analyzer.get_inprocess_tools()]
+        )
+        for analyzer in self.analyzers:
+            analyzer.toolchain = self.toolchain
+        if self.config.verbose:
+            for status in self.toolchain.statuses.values():
+                if not status.available:
+                    print(f"Warning: {status.name} is unavailable ({status.reason}), skipping it")
+        
+        # Offload CPU-bound analyzer stages to worker processes
+        if config.analysis.execution_mode == 'process':
+            self.process_pool = create_process_pool(self.analyzers, config.analysis.process_workers)
+            for analyzer in self.analyzers:
+                analyzer.cpu_executor = self.process_pool
+        elif config.analysis.execution_mode != 'async':
+            raise ValueError(f"Unsupported execution mode: {config.analysis.execution_mode}")
+        
+        # Run tools through their Python APIs in long-lived worker processes
+        if config.analysis.tool_backend == 'inprocess':
+            max_memory_mb = config.analysis.tool_worker_max_memory_mb
+            self.tool_pool = create_tool_pool(
+                config.analysis.tool_workers,
+                max_jobs_per_worker=config.analysis.tool_worker_max_jobs,
+                max_memory_bytes=max_memory_mb * 1024 * 1024 if max_memory_mb else None,
+                job_timeout=config.analysis.tool_worker_job_timeout,
+                cpu_limit=config.analysis.tool_cpu_limit,
+                memory_limit=memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+            )
+            for analyzer in self.analyzers:
+                analyzer.tool_executor = self.tool_pool
+        elif config.analysis.tool_backend != 'subprocess':
+            raise ValueError(f"Unsupported tool backend: {config.analysis.tool_backend}")
+        
+        if config.analysis.cache_enabled:
+            self.cache = AnalysisCache(
+                config.analysis.cache_dir, config.analysis.cache_max_size_mb * 1024 * 1024
+            )
     
     def _initialize_analyzers(self):
         """Initialize code analyzers"""
         # Quality analyzer
         quality_config = {
             'enable_pylint': self.config.analysis.enable_pylint,
+            'tool_backend': self.config.analysis.tool_backend,
+            'pylint_batch': self.config.analysis.pylint_batch,
+            'pylint_jobs': self.config.analysis.pylint_jobs,
+            'lint_backend': self.config.analysis.lint_backend,
+            'ruff_select': self.config.analysis.ruff_select,
+            'ruff_severity': self.config.analysis.ruff_severity,
             'min_complexity_score': self.config.analysis.min_complexity_score,
             'max_line_length': self.config.analysis.max_line_length
         }
@@ -39,6 +116,8 @@ class PRAgent:
         # Security analyzer
         security_config = {
             'enable_bandit': self.config.analysis.enable_bandit,
+            'bandit_batch': self.config.analysis.bandit_batch,
+            'tool_backend': self.config.analysis.tool_backend,
             'severity_threshold': 'medium'
         }
         self.analyzers.append(SecurityAnalyzer(security_config))
@@ -46,12 +125,32 @@ class PRAgent:
         # Style analyzer
         style_config = {
             'enable_black': self.config.analysis.enable_black,
+            'tool_backend': self.config.analysis.tool_backend,
             'enable_isort': self.config.analysis.enable_isort,
             'max_line_length': self.config.analysis.max_line_length,
             'require_docstrings': False
         }
         self.analyzers.append(StyleAnalyzer(style_config))
         
+        # Type checking analyzer (if enabled)
+        if self.config.analysis.enable_mypy:
+            typecheck_config = {
+                'enable_mypy': self.config.analysis.enable_mypy,
+                'mypy_cache_dir': str(self.config.analysis.mypy_cache_dir),
+                'mypy_options': self.config.analysis.mypy_options,
+                'mypy_idle_timeout': self.config.analysis.mypy_idle_timeout
+            }
+            self.analyzers.append(TypeCheckAnalyzer(typecheck_config))
+        
+        # Custom rule analyzer (if any rules are configured), compiled once here
+        if self.config.analysis.custom_rules:
+            custom_config = {
+                'custom_rules': [
+                    rule if isinstance(rule, str) else rule.dict() for rule in self.config.analysis.custom_rules
+                ]
+            }
+            self.analyzers.append(CustomRuleAnalyzer(custom_config))
+        
         # AI analyzer (if enabled)
         if self.config.ai.enabled:
             ai_config = {
@@ -89,52 +188,79 @@ class PRAgent:
         
         return self.adapters[server_name]
     
-    async def analyze_pr(self, server_name: str, repo: str, pr_number: int) -> Dict[str, Any]:
-        """Analyze a single pull request"""
+    async def analyze_pr(self, server_name: str, repo: str, pr_number: int,
+                         deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze a single pull request
+        
+        With a deadline (in seconds), optional work is shed as the budget runs down
+        and a partial result is returned once it is exhausted.
+        """
+        budget = self._create_budget(deadline)
         adapter = await self.get_adapter(server_name)
         
         # Fetch PR data
         pr_info = await adapter.fetch_pr(repo, pr_number)
         
-        # Analyze each changed file
+        return await self._analyze_pr_info(server_name, repo, pr_info, budget)
+    
+    async def analyze_pr_info(self, server_name: str, repo: str, pr_info: PRInfo,
+                              deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze an already fetched pull request"""
+        return await self._analyze_pr_info(server_name, repo, pr_info, self._create_budget(deadline))
+    
+    async def _analyze_pr_info(self, server_name: str, repo: str, pr_info: PRInfo,
+                               budget: Optional[LatencyBudget]) -> Dict[str, Any]:
+        """Analyze a fetched pull request within an optional latency budget"""
+        workspace = create_workspace()
+        try:
+            return await self._analyze_pr_files(server_name, repo, pr_info, budget, workspace)
+        finally:
+            remove_workspace(workspace)
+    
+    async def _analyze_pr_files(self, server_name: str, repo: str, pr_info: PRInfo,
+                                budget: Optional[LatencyBudget], workspace: str) -> Dict[str, Any]:
+        """Analyze the changed files of a pull request using the given scratch workspace"""
+        adapter = await self.get_adapter(server_name)
+        
+        # Analyze changed files concurrently, dispatching the most expensive first
+        file_changes = self._select_files(pr_info)
+        semaphore = asyncio.Semaphore(max(1, self.config.analysis.max_concurrent_files))
+        schedule = self.scheduler.plan(file_changes, self._get_file_analyzers, repo)
+        batch_inputs = {} if self._get_batch_analyzers(budget) else None
+        tool_failures = []
+        tasks = {}
+        for job in schedule:
+            tasks[job['index']] = asyncio.ensure_future(self._analyze_file(
+                adapter, repo, pr_info, file_changes[job['index']], semaphore, budget, batch_inputs, workspace,
+                tool_failures
+            ))
+        await asyncio.gather(*tasks.values())
+        
+        # Collect results in the original file order
+        file_results = [tasks[index].result() for index in range(len(file_changes))]
+        
+        # Run PR-level batch stages (e.g. one pylint process for all files)
+        if batch_inputs:
+            await self._run_batch_stages(
+                batch_inputs, dict(result for result in file_results if result is not None), budget, workspace, repo,
+                tool_failures
+            )
+        
         file_analyses = {}
         total_issues = []
         total_metrics = {}
+        cache_stats = {'hits': 0, 'misses': 0}
         
-        for file_change in pr_info.file_changes:
-            if file_change.change_type == 'deleted':
+        for file_result in file_results:
+            if file_result is None:
                 continue
             
-            # Get file content
-            try:
-                content = await adapter.get_file_content(repo, file_change.file_path, pr_info.source_branch)
-                
-                # Run all analyzers on the file
-                file_issues = []
-                file_metrics = {}
-                
-                for analyzer in self.analyzers:
-                    if self._should_analyze_file(file_change.file_path, analyzer):
-                        try:
-                            result = await analyzer.analyze(file_change.file_path, content)
-                            file_issues.extend(result.issues)
-                            file_metrics.update(result.metrics)
-                        except Exception as e:
-                            if self.config.verbose:
-                                print(f"Warning: Analyzer {analyzer.__class__.__name__} failed for {file_change.file_path}: {e}")
-                
-                file_analyses[file_change.file_path] = {
-                    'issues': file_issues,
-                    'metrics': file_metrics,
-                    'score': self._calculate_file_score(file_issues)
-                }
-                
-                total_issues.extend(file_issues)
-                total_metrics.update(file_metrics)
-                
-            except Exception as e:
-                if self.config.verbose:
-                    print(f"Warning: Could not analyze {file_change.file_path}: {e}")
+            file_path, file_analysis = file_result
+            file_analyses[file_path] = file_analysis
+            total_issues.extend(file_analysis['issues'])
+            total_metrics.update(file_analysis['metrics'])
+            cache_stats['hits'] += file_analysis['cache']['hits']
+            cache_stats['misses'] += file_analysis['cache']['misses']
         
         # Generate overall analysis
         overall_score = self._calculate_overall_score(total_issues)
@@ -145,8 +271,9 @@ class PRAgent:
         )
         
         # Generate report
+        skipped_files = budget.skipped_files if budget is not None else []
         report = await self.report_generator.generate_report(
-            pr_info, file_analyses, total_issues, total_metrics, overall_score
+            pr_info, file_analyses, total_issues, total_metrics, overall_score, skipped_files
         )
         
         return {
@@ -155,10 +282,367 @@ class PRAgent:
             'overall_score': overall_score,
             'total_issues': len(total_issues),
             'issues_by_severity': self._group_issues_by_severity(total_issues),
+            'cache': cache_stats,
+            'schedule': self.scheduler.estimates(schedule),
+            'partial': bool(skipped_files) or any(
+                analysis['skipped'] or analysis['timed_out'] for analysis in file_analyses.values()
+            ),
+            'skipped': report['skipped'],
+            'toolchain': self.toolchain.report(tool_failures),
             'feedback': feedback,
             'report': report
         }
     
+    async def analyze_pr_stream(self, server_name: str, repo: str, pr_number: int,
+                                deadline: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Analyze a pull request, yielding each file's results as soon as they are ready
+        
+        Yields a 'file' event per analyzed file in completion order, followed by a
+        'summary' event. Issues are not kept once yielded, so memory stays bounded
+        by the number of files in flight. Issues from PR-level batch stages arrive
+        in 'batch' events once every file is done.
+        """
+        budget = self._create_budget(deadline)
+        adapter = await self.get_adapter(server_name)
+        pr_info = await adapter.fetch_pr(repo, pr_number)
+        
+        workspace = create_workspace()
+        try:
+            async for event in self._stream_pr_files(adapter, repo, pr_info, budget, workspace):
+                yield event
+        finally:
+            remove_workspace(workspace)
+    
+    async def _stream_pr_files(self, adapter: GitAdapter, repo: str, pr_info: PRInfo,
+                               budget: Optional[LatencyBudget], workspace: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the events of analyze_pr_stream using the given scratch workspace"""
+        file_changes = self._select_files(pr_info)
+        schedule = self.scheduler.plan(file_changes, self._get_file_analyzers, repo)
+        remaining = (file_changes[job['index']] for job in schedule)
+        batch_inputs = {} if self._get_batch_analyzers(budget) else None
+        tool_failures = []
+        limit = max(1, self.config.analysis.max_concurrent_files)
+        semaphore = asyncio.Semaphore(limit)
+        pending = set()
+        
+        completed = 0
+        files_analyzed = 0
+        severity_counts = {}
+        cache_stats = {'hits': 0, 'misses': 0}
+        
+        try:
+            while True:
+                # Only start new files as earlier ones finish
+                while len(pending) < limit:
+                    file_change = next(remaining, None)
+                    if file_change is None:
+                        break
+                    pending.add(asyncio.ensure_future(self._analyze_file(
+                        adapter, repo, pr_info, file_change, semaphore, budget, batch_inputs, workspace, tool_failures
+                    )))
+                
+                if not pending:
+                    break
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    completed += 1
+                    file_result = task.result()
+                    if file_result is None:
+                        continue
+                    
+                    file_path, file_analysis = file_result
+                    files_analyzed += 1
+                    for severity, count in self._group_issues_by_severity(file_analysis['issues']).items():
+                        severity_counts[severity] = severity_counts.get(severity, 0) + count
+                    cache_stats['hits'] += file_analysis['cache']['hits']
+                    cache_stats['misses'] += file_analysis['cache']['misses']
+                    
+                    yield {
+                        'type': 'file',
+                        'file_path': file_path,
+                        'progress': {'completed': completed, 'total': len(file_changes)},
+                        **file_analysis
+                    }
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        # Run PR-level batch stages once all files are done
+        if batch_inputs:
+            batch_analyses = {
+                file_path: {'issues': [], 'timed_out': [], 'errors': {}, 'score': 100.0}
+                for file_path in batch_inputs
+            }
+            await self._run_batch_stages(batch_inputs, batch_analyses, budget, workspace, repo, tool_failures)
+            batch_inputs.clear()
+            
+            for file_path, batch_analysis in batch_analyses.items():
+                if not (batch_analysis['issues'] or batch_analysis['timed_out'] or batch_analysis['errors']):
+                    continue
+                
+                for severity, count in self._group_issues_by_severity(batch_analysis['issues']).items():
+                    severity_counts[severity] = severity_counts.get(severity, 0) + count
+                
+                yield {
+                    'type': 'batch',
+                    'file_path': file_path,
+                    'issues': batch_analysis['issues'],
+                    'timed_out': batch_analysis['timed_out'],
+                    'errors': batch_analysis['errors']
+                }
+        
+        yield {
+            'type': 'summary',
+            'pr_info': pr_info,
+            'files_analyzed': files_analyzed,
+            'overall_score': self._score_from_severity_counts(severity_counts),
+            'total_issues': sum(severity_counts.values()),
+            'issues_by_severity': severity_counts,
+            'cache': cache_stats,
+            'skipped_files': budget.skipped_files if budget is not None else [],
+            'toolchain': self.toolchain.report(tool_failures)
+        }
+    
+    async def _analyze_file(self, adapter: GitAdapter, repo: str, pr_info: PRInfo,
+                            file_change: FileChange, semaphore: asyncio.Semaphore,
+                            budget: Optional[LatencyBudget] = None,
+                            batch_inputs: Optional[Dict[str, Tuple[str, AnalysisContext]]] = None,
+                            workspace: Optional[str] = None,
+                            tool_failures: Optional[List[Any]] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Fetch and analyze a single changed file
+        
+        When batch_inputs is given, the file's content and context are kept there
+        for the PR-level batch stages. Failed tool runs are appended to tool_failures.
+        """
+        async with semaphore:
+            # Files that have not started by the deadline are skipped
+            if budget is not None and budget.expired():
+                budget.skipped_files.append(file_change.file_path)
+                return None
+            
+            # Get file content
+            try:
+                content = await adapter.get_file_content(repo, file_change.file_path, pr_info.source_branch)
+                context = self._build_context(file_change, content, budget, workspace, repo, tool_failures)
+                if batch_inputs is not None:
+                    # Batch stages don't need the parsed source, so don't keep it alive until they run
+                    batch_inputs[file_change.file_path] = (content, replace(context, source=None))
+                
+                # Run all applicable analyzers on the file concurrently
+                analyzers = []
+                skipped = []
+                for analyzer in self._get_file_analyzers(file_change.file_path):
+                    if analyzer.stage in context.skipped_stages:
+                        skipped.append(analyzer.__class__.__name__)
+                    else:
+                        analyzers.append(analyzer)
+                
+                # Rules that several analyzers enable run once below instead of in each analyzer
+                rule_plan = RulePlan(analyzers)
+                context.shared_rules = set(rule_plan.rule_ids)
+                
+                outcomes = await asyncio.gather(*[
+                    self._run_analyzer(analyzer, file_change.file_path, content, context, budget)
+                    for analyzer in analyzers
+                ], return_exceptions=True)
+                
+                file_issues = []
+                file_metrics = {}
+                timed_out = []
+                errors = {}
+                cache_stats = {'hits': 0, 'misses': 0}
+                
+                for analyzer, outcome in zip(analyzers, outcomes):
+                    analyzer_name = analyzer.__class__.__name__
+                    if isinstance(outcome, asyncio.TimeoutError):
+                        timed_out.append(analyzer_name)
+                        if budget is not None and budget.expired():
+                            skipped.append(analyzer_name)
+                        if self.config.verbose:
+                            print(f"Warning: Analyzer {analyzer_name} timed out for {file_change.file_path}")
+                    elif isinstance(outcome, BaseException):
+                        errors[analyzer_name] = str(outcome)
+                        if self.config.verbose:
+                            print(f"Warning: Analyzer {analyzer_name} failed for {file_change.file_path}: {outcome}")
+                    else:
+                        result, cached = outcome
+                        file_issues.extend(result.issues)
+                        file_metrics.update(result.metrics)
+                        if self.cache is not None:
+                            cache_stats['hits' if cached else 'misses'] += 1
+                
+                shared_issues, rule_consumers = rule_plan.execute(file_change.file_path, context.source, context)
+                file_issues.extend(shared_issues)
+                
+                # Tools are shed up front, or abandoned mid-run once the budget reaches their stage
+                if 'tools' in context.skipped_stages:
+                    skipped.append('tools')
+                
+                # Drop issues outside the changed lines in diff-aware mode
+                if context.changed_lines is not None:
+                    file_issues = self._filter_changed_lines(file_issues, context.changed_lines)
+                
+                return file_change.file_path, {
+                    'issues': file_issues,
+                    'metrics': file_metrics,
+                    'score': self._calculate_file_score(file_issues),
+                    'timed_out': timed_out,
+                    'skipped': skipped,
+                    'errors': errors,
+                    'shared_rules': rule_consumers,
+                    'cache': cache_stats
+                }
+                
+            except Exception as e:
+                if self.config.verbose:
+                    print(f"Warning: Could not analyze {file_change.file_path}: {e}")
+                return None
+    
+    def _get_batch_analyzers(self, budget: Optional[LatencyBudget] = None) -> List[Any]:
+        """Get the analyzers with a PR-level batch stage"""
+        context = AnalysisContext(skipped_stages=budget.shed_stages() if budget is not None else set())
+        return [
+            analyzer for analyzer in self.analyzers
+            if analyzer.stage not in context.skipped_stages and analyzer.has_batch_stage(context)
+        ]
+    
+    async def _run_batch_stages(self, batch_inputs: Dict[str, Tuple[str, AnalysisContext]],
+                                file_analyses: Dict[str, Dict[str, Any]],
+                                budget: Optional[LatencyBudget] = None,
+                                workspace: Optional[str] = None, repo: Optional[str] = None,
+                                tool_failures: Optional[List[Any]] = None) -> None:
+        """Run every analyzer's batch stage and merge the issues into the file analyses"""
+        context = AnalysisContext(
+            skipped_stages=budget.shed_stages() if budget is not None else set(),
+            workspace=workspace,
+            repo=repo,
+            tool_failures=tool_failures
+        )
+        analyzers = self._get_batch_analyzers(budget)
+        analyzer_files = [
+            {
+                file_path: content for file_path, (content, _) in batch_inputs.items()
+                if file_path in file_analyses and self._should_analyze_file(file_path, analyzer)
+            }
+            for analyzer in analyzers
+        ]
+        
+        async def run_batch(analyzer: Any, files: Dict[str, str]) -> Dict[str, List[Any]]:
+            # A batch stage covers the whole PR, so the per-file analyzer deadline doesn't fit it
+            timeout = self.config.analysis.batch_timeout
+            if budget is not None:
+                timeout = budget.remaining() if timeout is None else min(timeout, budget.remaining())
+            return await asyncio.wait_for(analyzer.analyze_batch(files, context), timeout=timeout)
+        
+        outcomes = await asyncio.gather(*[
+            run_batch(analyzer, files) for analyzer, files in zip(analyzers, analyzer_files)
+        ], return_exceptions=True)
+        
+        for analyzer, files, outcome in zip(analyzers, analyzer_files, outcomes):
+            analyzer_name = analyzer.__class__.__name__
+            if isinstance(outcome, BaseException):
+                for file_path in files:
+                    if isinstance(outcome, asyncio.TimeoutError):
+                        file_analyses[file_path]['timed_out'].append(analyzer_name)
+                    else:
+                        file_analyses[file_path]['errors'][analyzer_name] = str(outcome)
+                if self.config.verbose:
+                    print(f"Warning: Batch stage of {analyzer_name} failed: {outcome!r}")
+                continue
+            
+            for file_path, issues in outcome.items():
+                if file_path not in file_analyses:
+                    continue
+                
+                # Drop issues outside the changed lines in diff-aware mode
+                changed_lines = batch_inputs[file_path][1].changed_lines
+                if changed_lines is not None:
+                    issues = self._filter_changed_lines(issues, changed_lines)
+                
+                file_analysis = file_analyses[file_path]
+                file_analysis['issues'].extend(issues)
+                file_analysis['score'] = self._calculate_file_score(file_analysis['issues'])
+    
+    def _filter_changed_lines(self, issues: List[Any], changed_lines: ChangedLines) -> List[Any]:
+        """Keep the issues whose line range touches a changed line"""
+        return [
+            issue for issue in issues
+            if changed_lines.overlaps(issue.line_number, issue.end_line_number or issue.line_number)
+        ]
+    
+    def _create_budget(self, deadline: Optional[float] = None) -> Optional[LatencyBudget]:
+        """Create the latency budget for one PR, falling back to the configured deadline"""
+        if deadline is None:
+            deadline = self.config.analysis.deadline
+        if deadline is None:
+            return None
+        return LatencyBudget(deadline, self.config.analysis.degradation_order)
+    
+    def _build_context(self, file_change: FileChange, content: str,
+                       budget: Optional[LatencyBudget] = None,
+                       workspace: Optional[str] = None, repo: Optional[str] = None,
+                       tool_failures: Optional[List[Any]] = None) -> AnalysisContext:
+        """Build the analysis context shared by all analyzers of a file"""
+        changed_lines = None
+        if self.config.analysis.changed_lines_only and file_change.diff:
+            changed_lines = ChangedLines.from_diff(file_change.diff, self.config.analysis.diff_context_lines)
+        
+        skipped_stages = budget.shed_stages() if budget is not None else set()
+        tool_deadline = budget.stage_deadline('tools') if budget is not None else None
+        
+        # Lines, AST and tokens are derived once here rather than by each analyzer
+        return AnalysisContext(
+            changed_lines=changed_lines, skipped_stages=skipped_stages, tool_deadline=tool_deadline,
+            workspace=workspace, repo=repo, source=SourceView(content), tool_failures=tool_failures
+        )
+    
+    async def _run_analyzer(self, analyzer: Any, file_path: str, content: str,
+                            context: AnalysisContext,
+                            budget: Optional[LatencyBudget] = None) -> Tuple[AnalysisResult, bool]:
+        """Run a single analyzer, cancelling it when its deadline passes
+        
+        Returns the result and whether it was served from the result cache.
+        """
+        cache_key = None
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            cache_key = self.cache.make_key(analyzer, file_path, content, context)
+            # SQLite may wait on other writers, so keep it off the event loop
+            cached_result = await loop.run_in_executor(None, self.cache.get, cache_key)
+            if cached_result is not None:
+                return self._relocate_result(cached_result, file_path), True
+        
+        timeout = self._get_analyzer_timeout(analyzer)
+        if budget is not None:
+            timeout = budget.remaining() if timeout is None else min(timeout, budget.remaining())
+        started = time.monotonic()
+        result = await asyncio.wait_for(analyzer.analyze(file_path, content, context), timeout=timeout)
+        self.scheduler.record(
+            analyzer.__class__.__name__, file_path, len(content), time.monotonic() - started, context.repo
+        )
+        
+        # Results missing a failed or unavailable tool's findings would hide them on later runs
+        if cache_key is not None and result.complete:
+            await loop.run_in_executor(None, self.cache.put, cache_key, result)
+        return result, False
+    
+    def _relocate_result(self, result: AnalysisResult, file_path: str) -> AnalysisResult:
+        """Point a cached result (possibly computed for a file elsewhere) at file_path"""
+        if result.file_path == file_path:
+            return result
+        return replace(
+            result, file_path=file_path, issues=[replace(issue, file_path=file_path) for issue in result.issues]
+        )
+    
+    def _get_analyzer_timeout(self, analyzer: Any) -> Optional[float]:
+        """Get the configured deadline for an analyzer"""
+        timeouts = self.config.analysis.analyzer_timeouts
+        analyzer_name = analyzer.__class__.__name__
+        if analyzer_name in timeouts:
+            return timeouts[analyzer_name]
+        return self.config.analysis.analyzer_timeout
+    
     async def analyze_multiple_prs(self, server_name: str, repo: str, 
                                  state: str = "open", limit: int = 10) -> List[Dict[str, Any]]:
         """Analyze multiple pull requests"""
@@ -167,17 +651,27 @@ class PRAgent:
         # Fetch PRs
         pr_infos = await adapter.fetch_prs(repo, state, limit)
         
-        # Analyze each PR
-        results = []
-        for pr_info in pr_infos:
+        # Analyze PRs concurrently, reusing the already fetched PR data
+        semaphore = asyncio.Semaphore(max(1, self.config.analysis.max_concurrent_prs))
+        pr_results = await asyncio.gather(*[
+            self._analyze_pr_info_bounded(server_name, repo, pr_info, semaphore)
+            for pr_info in pr_infos
+        ])
+        
+        results = [result for result in pr_results if result is not None]
+        
+        return results
+    
+    async def _analyze_pr_info_bounded(self, server_name: str, repo: str, pr_info: PRInfo,
+                                       semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        """Analyze a fetched PR once a concurrency slot is free"""
+        async with semaphore:
             try:
-                result = await self.analyze_pr(server_name, repo, int(pr_info.id))
-                results.append(result)
+                return await self.analyze_pr_info(server_name, repo, pr_info)
             except Exception as e:
                 if self.config.verbose:
                     print(f"Warning: Failed to analyze PR {pr_info.id}: {e}")
-        
-        return results
+                return None
     
     async def post_review(self, server_name: str, repo: str, pr_number: int, 
                          analysis_result: Dict[str, Any]) -> str:
@@ -205,6 +699,19 @@ class PRAgent:
             comment_url = await adapter.post_comment(repo, pr_number, general_comment)
             return comment_url
     
+    def _select_files(self, pr_info: PRInfo) -> List[FileChange]:
+        """Select the changed files worth fetching, before any content is downloaded"""
+        return [
+            file_change for file_change in pr_info.file_changes
+            if file_change.change_type != 'deleted'
+            and self.path_matcher.matches(file_change.file_path)
+            and self._get_file_analyzers(file_change.file_path)
+        ]
+    
+    def _get_file_analyzers(self, file_path: str) -> List[Any]:
+        """Get the analyzers that apply to a file"""
+        return [analyzer for analyzer in self.analyzers if self._should_analyze_file(file_path, analyzer)]
+    
     def _should_analyze_file(self, file_path: str, analyzer: Any) -> bool:
         """Check if file should be analyzed by the given analyzer"""
         file_ext = Path(file_path).suffix
@@ -212,7 +719,12 @@ class PRAgent:
     
     def _calculate_file_score(self, issues: List[Any]) -> float:
         """Calculate score for a single file"""
-        if not issues:
+        return self._score_from_severity_counts(self._group_issues_by_severity(issues))
+    
+    def _score_from_severity_counts(self, severity_counts: Dict[str, int]) -> float:
+        """Calculate a score from issue counts per severity"""
+        issue_count = sum(severity_counts.values())
+        if not issue_count:
             return 100.0
         
         # Weight issues by severity
@@ -223,8 +735,8 @@ class PRAgent:
             'critical': 15
         }
         
-        total_weight = sum(severity_weights.get(issue.severity.value, 1) for issue in issues)
-        max_possible_weight = len(issues) * 15  # All critical issues
+        total_weight = sum(severity_weights.get(severity, 1) * count for severity, count in severity_counts.items())
+        max_possible_weight = issue_count * 15  # All critical issues
         
         if max_possible_weight == 0:
             return 100.0
@@ -250,7 +762,24 @@ class PRAgent:
         return groups
     
     async def close(self):
-        """Close all adapters"""
+        """Close all adapters, analyzer daemons and worker processes"""
+        self.scheduler.save_history()
+        
         for adapter in self.adapters.values():
             if hasattr(adapter, 'close'):
                 await adapter.close()
+        
+        for analyzer in self.analyzers:
+            await analyzer.close()
+        
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+            self.process_pool = None
+        
+        if self.tool_pool is not None:
+            self.tool_pool.shutdown()
+            self.tool_pool = None
+        
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
@@ -0,0 +1,55 @@
+"""
+Latency budget for time-boxed PR analysis
+"""
+
+import time
+from typing import List, Set
+
+
+class LatencyBudget:
+    """Wall-clock budget for one PR analysis that sheds optional work as it runs down
+    
+    With n stages in the degradation order, stage i is shed once the remaining
+    fraction of the budget drops below (n - i) / (n + 1). With the default order
+    ["ai", "tools"], AI analysis stops at 2/3 of the budget remaining and tool
+    subprocesses at 1/3, while regex and AST checks run until the deadline. Tool
+    runs already in flight are abandoned at that point too (see stage_deadline).
+    """
+    
+    def __init__(self, seconds: float, degradation_order: List[str]):
+        self.seconds = seconds
+        self.degradation_order = list(degradation_order)
+        self.started = time.monotonic()
+        self.skipped_files: List[str] = []
+    
+    def elapsed(self) -> float:
+        """Get the seconds spent so far"""
+        return time.monotonic() - self.started
+    
+    def remaining(self) -> float:
+        """Get the seconds left before the deadline"""
+        return max(0.0, self.seconds - self.elapsed())
+    
+    def expired(self) -> bool:
+        """Check whether the deadline has passed"""
+        return self.remaining() <= 0
+    
+    def stage_deadline(self, stage: str) -> float:
+        """Get the time.monotonic() at which a stage is shed (the deadline if it is never shed)"""
+        if stage not in self.degradation_order or self.seconds <= 0:
+            return self.started + max(0.0, self.seconds)
+        stage_count = len(self.degradation_order)
+        shed_fraction = (stage_count - self.degradation_order.index(stage)) / (stage_count + 1)
+        return self.started + self.seconds * (1 - shed_fraction)
+    
+    def shed_stages(self) -> Set[str]:
+        """Get the stages that should be skipped at this point of the budget"""
+        if self.seconds <= 0:
+            return set(self.degradation_order)
+        
+        remaining_fraction = self.remaining() / self.seconds
+        stage_count = len(self.degradation_order)
+        return {
+            stage for i, stage in enumerate(self.degradation_order)
+            if remaining_fraction < (stage_count - i) / (stage_count + 1)
+        }
@@ -2,7 +2,7 @@
 Configuration management for PR Agent
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from pydantic import BaseModel, Field
 from pathlib import Path
 
@@ -17,25 +17,96 @@ class GitServerConfig(BaseModel):
     verify_ssl: bool = True
 
 
+class CustomRuleConfig(BaseModel):
+    """A regex checked against every line of the analyzed files"""
+    pattern: str
+    id: Optional[str] = None  # rule_id of the reported issues, defaults to custom-rule-<n>
+    message: Optional[str] = None
+    severity: str = "medium"  # low, medium, high, critical
+    issue_type: str = "maintainability"  # bug, security, style, performance, maintainability, documentation
+    suggestion: Optional[str] = None
+    ignore_case: bool = False
+
+
 class AnalysisConfig(BaseModel):
     """Configuration for code analysis rules"""
     enable_pylint: bool = True
     enable_bandit: bool = True
     enable_black: bool = True
     enable_isort: bool = True
-    enable_mypy: bool = True
+    enable_mypy: bool = False  # runs a dmypy daemon and keeps a copy of the PR's files under mypy_cache_dir
+    
+    # Run pylint once per PR over all changed Python files instead of once per file
+    pylint_batch: bool = False
+    pylint_jobs: int = 0  # pylint --jobs, 0 uses every CPU
+    bandit_batch: bool = False  # run bandit once per PR instead of once per file
+    
+    # Lint backend: "pylint", "ruff" or "ruff+pylint" (pylint only for the checks
+    # ruff doesn't cover). ruff lints all changed files of a PR in one run.
+    lint_backend: str = "pylint"
+    ruff_select: List[str] = Field(default_factory=list)  # ruff --select, empty for ruff's defaults
+    ruff_severity: Dict[str, str] = Field(default_factory=dict)  # rule-code prefix -> severity overrides
+    
+    # Type checking with the mypy daemon (one per repository, incremental across PRs)
+    mypy_cache_dir: Path = Path("~/.cache/pragent/mypy")
+    mypy_options: List[str] = Field(default_factory=lambda: ["--ignore-missing-imports"])
+    mypy_idle_timeout: int = 600  # seconds before an idle daemon shuts itself down
     
     # Quality thresholds
     min_complexity_score: int = 5
     max_line_length: int = 88
     min_test_coverage: float = 0.8
     
-    # Custom rules
-    custom_rules: List[str] = Field(default_factory=list)
+    # Custom rules: regex patterns, or CustomRuleConfig objects for an ID, message and severity
+    custom_rules: List[Union[str, CustomRuleConfig]] = Field(default_factory=list)
     
     # File patterns to analyze
     include_patterns: List[str] = Field(default_factory=lambda: ["*.py", "*.js", "*.ts", "*.java", "*.go"])
     exclude_patterns: List[str] = Field(default_factory=lambda: ["*.min.js", "*.bundle.js", "node_modules/**", "venv/**"])
+    
+    # Diff-aware analysis: only report issues on changed lines (plus a context margin)
+    changed_lines_only: bool = False
+    diff_context_lines: int = 3
+    
+    # Latency budget: seconds per PR (None for no deadline) and the order in which
+    # optional stages are shed as it runs down ("ai": AI analysis, "tools": external tools)
+    deadline: Optional[float] = None
+    degradation_order: List[str] = Field(default_factory=lambda: ["ai", "tools"])
+    
+    # Persistent analysis result cache
+    cache_enabled: bool = False
+    cache_dir: Path = Path("~/.cache/pragent")
+    cache_max_size_mb: int = 256
+    
+    # Concurrency
+    max_concurrent_files: int = 8  # files fetched and analyzed at the same time per PR
+    max_concurrent_prs: int = 4  # PRs analyzed at the same time by analyze_multiple_prs
+    max_concurrent_tools: Optional[int] = None  # external tool processes at once; defaults to the CPU count
+    
+    # Resource limits for each external tool process (None for no limit)
+    tool_cpu_limit: Optional[int] = 120  # seconds of CPU time
+    tool_memory_limit_mb: Optional[int] = 4096  # address space
+    
+    # Longest-job-first scheduling
+    scheduler_smoothing: float = 0.3  # weight of new timings in the cost model
+    scheduler_history_file: Optional[Path] = None  # persist learned timings between runs
+    
+    # How pylint, bandit, black and isort are run: "subprocess" spawns the CLI per
+    # call, "inprocess" calls their Python APIs in a pool of warm worker processes
+    tool_backend: str = "subprocess"
+    tool_workers: Optional[int] = None  # defaults to the number of CPUs
+    tool_worker_max_jobs: Optional[int] = 500  # recycle a tool worker after this many jobs
+    tool_worker_max_memory_mb: Optional[int] = 512  # ...or once its RSS grows past this
+    tool_worker_job_timeout: Optional[float] = 60.0  # kill and replace a worker stuck in a job this long
+    
+    # Execution of CPU-bound analyzer stages
+    execution_mode: str = "async"  # async, process
+    process_workers: Optional[int] = None  # defaults to the number of CPUs
+    
+    # Analyzer deadlines in seconds (None disables the deadline)
+    analyzer_timeout: Optional[float] = 60.0
+    analyzer_timeouts: Dict[str, Optional[float]] = Field(default_factory=dict)  # per analyzer class name
+    batch_timeout: Optional[float] = 600.0  # PR-level batch stages (batched pylint, bandit, ruff, dmypy)
 
 
 class AIConfig(BaseModel):
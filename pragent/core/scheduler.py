@@ -0,0 +1,124 @@
+"""
+Cost-aware scheduling of file analysis jobs
+"""
+
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from ..adapters import FileChange
+
+
+class AnalysisScheduler:
+    """Estimates (file, analyzer) job costs and dispatches expensive files first
+    
+    A job's cost is modelled as ``rate * (size_kb + 1)`` seconds, where the rate
+    per analyzer starts from a rough default and is refined from observed timings
+    with an exponential moving average. Files are dispatched longest-job-first,
+    which keeps a large file from starting last and stretching the makespan.
+    Observed file sizes are remembered per repository and path, for at most
+    max_file_sizes files (least recently used first out).
+    """
+    
+    # Initial seconds per (KB + 1) before any timings are recorded
+    DEFAULT_RATES = {
+        'QualityAnalyzer': 1.0,  # pylint subprocess dominates
+        'SecurityAnalyzer': 0.4,  # bandit subprocess
+        'StyleAnalyzer': 0.3,  # black and isort subprocesses
+        'AIAnalyzer': 2.0,  # remote API round trip
+    }
+    UNKNOWN_RATE = 0.1
+    AVERAGE_LINE_BYTES = 40
+    
+    def __init__(self, smoothing: float = 0.3, history_file: Optional[Path] = None,
+                 max_file_sizes: int = 10000):
+        self.smoothing = smoothing
+        self.history_file = Path(history_file).expanduser() if history_file else None
+        self.rates: Dict[str, float] = dict(self.DEFAULT_RATES)
+        self.max_file_sizes = max_file_sizes
+        self.file_sizes: "OrderedDict[Tuple[Optional[str], str], int]" = OrderedDict()
+        self.last_plan: List[Dict[str, Any]] = []
+        
+        if self.history_file and self.history_file.exists():
+            self._load_history()
+    
+    def estimate_size(self, file_change: FileChange, repo: Optional[str] = None) -> int:
+        """Estimate a file's size in bytes before its content is fetched"""
+        key = (repo, file_change.file_path)
+        if key in self.file_sizes:
+            self.file_sizes.move_to_end(key)
+            return self.file_sizes[key]
+        if file_change.change_type == 'added':
+            return file_change.additions * self.AVERAGE_LINE_BYTES
+        return max(len(file_change.diff), (file_change.additions + file_change.deletions) * self.AVERAGE_LINE_BYTES)
+    
+    def estimate(self, analyzer_name: str, size: int) -> float:
+        """Estimate the cost in seconds of running an analyzer on a file of the given size"""
+        rate = self.rates.get(analyzer_name, self.UNKNOWN_RATE)
+        return rate * (size / 1024 + 1)
+    
+    def plan(self, file_changes: List[FileChange], analyzers_for: Callable[[str], List[Any]],
+             repo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the cost estimates of file_changes in dispatch order, most expensive first"""
+        plan = []
+        for index, file_change in enumerate(file_changes):
+            size = self.estimate_size(file_change, repo)
+            job_costs = {
+                analyzer.__class__.__name__: round(self.estimate(analyzer.__class__.__name__, size), 4)
+                for analyzer in analyzers_for(file_change.file_path)
+            }
+            # A file's analyzers run concurrently, so it holds its slot for the slowest one
+            plan.append({
+                'index': index,
+                'file_path': file_change.file_path,
+                'estimated_size': size,
+                'estimated_cost': max(job_costs.values(), default=0.0),
+                'jobs': job_costs
+            })
+        
+        plan.sort(key=lambda job: job['estimated_cost'], reverse=True)
+        self.last_plan = plan
+        return plan
+    
+    def record(self, analyzer_name: str, file_path: str, size: int, elapsed: float,
+               repo: Optional[str] = None) -> None:
+        """Record an observed job duration"""
+        key = (repo, file_path)
+        self.file_sizes[key] = size
+        self.file_sizes.move_to_end(key)
+        while len(self.file_sizes) > self.max_file_sizes:
+            self.file_sizes.popitem(last=False)
+        observed_rate = elapsed / (size / 1024 + 1)
+        previous_rate = self.rates.get(analyzer_name)
+        if previous_rate is None:
+            self.rates[analyzer_name] = observed_rate
+        else:
+            self.rates[analyzer_name] = (1 - self.smoothing) * previous_rate + self.smoothing * observed_rate
+    
+    def estimates(self, plan: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Get the current cost model and a dispatch plan (the last one by default), for tuning"""
+        if plan is None:
+            plan = self.last_plan
+        return {
+            'rates': dict(self.rates),
+            'plan': [{k: v for k, v in job.items() if k != 'index'} for job in plan]
+        }
+    
+    def _load_history(self) -> None:
+        """Load learned rates from the history file"""
+        try:
+            with open(self.history_file, 'r') as f:
+                data = json.load(f)
+            self.rates.update(data.get('rates', {}))
+        except (OSError, ValueError):
+            pass
+    
+    def save_history(self) -> None:
+        """Persist learned rates to the history file"""
+        if not self.history_file:
+            return
+        
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.history_file, 'w') as f:
+            json.dump({'rates': self.rates}, f, indent=2)
@@ -0,0 +1,136 @@
+"""
+Persistent, content-addressed cache for analysis results
+"""
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .. import __version__
+from ..analyzers import AnalysisResult
+
+
+class AnalysisCache:
+    """On-disk LRU cache of AnalysisResult objects, shared safely between processes
+    
+    get and put block on disk I/O and on other processes' writes, so the agent
+    calls them from executor threads; a lock keeps those threads off the shared
+    connection at the same time.
+    """
+    
+    def __init__(self, cache_dir: Path, max_size_bytes: int):
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        # SQLite serializes concurrent writers; WAL keeps readers unblocked
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / 'analysis-cache.sqlite3'),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'size INTEGER NOT NULL, last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)')
+    
+    def make_key(self, analyzer: Any, file_path: str, content: str, context: Any = None) -> str:
+        """Build the cache key from content, file name, analyzer class and config, and tool versions
+        
+        The file name (not its directory) is part of the key because analyzers pick
+        checks by extension and pylint names the module after the file, so equal
+        content is shared across directories only.
+        """
+        analyzer_class = analyzer.__class__
+        toolchain = getattr(analyzer, 'toolchain', None)
+        key_data = {
+            'version': __version__,
+            'analyzer': f"{analyzer_class.__module__}.{analyzer_class.__qualname__}",
+            'config': analyzer.config,
+            'tools': toolchain.versions(analyzer.get_required_tools()) if toolchain is not None else None,
+            'file_name': Path(file_path).name,
+            'changed_lines': getattr(getattr(context, 'changed_lines', None), 'ranges', None),
+            'skipped_stages': sorted(getattr(context, 'skipped_stages', ())),
+            'shared_rules': sorted(getattr(context, 'shared_rules', ())),
+            'content': hashlib.sha256(content.encode('utf-8', 'surrogatepass')).hexdigest()
+        }
+        serialized = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        """Get a cached result, counting the hit or miss"""
+        with self._lock:
+            return self._get(key)
+    
+    def _get(self, key: str) -> Optional[AnalysisResult]:
+        """get, with the lock held"""
+        row = self._conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        
+        try:
+            result = pickle.loads(row[0])
+        except Exception:
+            # Unreadable entry (e.g. written by an incompatible version)
+            self._conn.execute('DELETE FROM results WHERE key = ?', (key,))
+            self.misses += 1
+            return None
+        
+        self._conn.execute('UPDATE results SET last_access = ? WHERE key = ?', (time.time(), key))
+        self.hits += 1
+        return result
+    
+    def put(self, key: str, result: AnalysisResult) -> None:
+        """Store a result and evict least recently used entries over the size cap"""
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO results (key, value, size, last_access) VALUES (?, ?, ?, ?)',
+                    (key, value, len(value), time.time())
+                )
+                self._evict()
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+    
+    def _evict(self) -> None:
+        """Delete the oldest entries until the cache fits its size cap"""
+        total_size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+        
+        excess = total_size - self.max_size_bytes
+        stale_keys = []
+        for key, size in self._conn.execute('SELECT key, size FROM results ORDER BY last_access'):
+            stale_keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        
+        self._conn.executemany('DELETE FROM results WHERE key = ?', stale_keys)
+    
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters"""
+        return {'hits': self.hits, 'misses': self.misses}
+    
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
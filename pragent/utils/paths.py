@@ -0,0 +1,33 @@
+"""
+Path filtering for changed files
+"""
+
+import fnmatch
+import re
+from typing import List, Optional, Pattern
+
+
+class PathMatcher:
+    """Include/exclude glob patterns compiled into one regular expression each
+    
+    Patterns match the full repository path or any trailing part of it, so
+    "node_modules/**" also excludes "web/node_modules/lib.js".
+    """
+    
+    def __init__(self, include_patterns: List[str], exclude_patterns: List[str]):
+        self._include = self._compile(include_patterns)
+        self._exclude = self._compile(exclude_patterns)
+    
+    @staticmethod
+    def _compile(patterns: List[str]) -> Optional[Pattern]:
+        """Compile glob patterns into a single anchored regex"""
+        if not patterns:
+            return None
+        alternatives = '|'.join(fnmatch.translate(pattern) for pattern in patterns)
+        return re.compile(f'(?:.*/)?(?:{alternatives})')
+    
+    def matches(self, file_path: str) -> bool:
+        """Check whether a path is included and not excluded"""
+        if self._include is not None and not self._include.match(file_path):
+            return False
+        return self._exclude is None or not self._exclude.match(file_path)
@@ -4,7 +4,7 @@ Report generation utilities
 
 import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
 from ..adapters import PRInfo
@@ -19,7 +19,8 @@ class ReportGenerator:
     
     async def generate_report(self, pr_info: PRInfo, file_analyses: Dict[str, Any], 
                             total_issues: List[Issue], total_metrics: Dict[str, Any], 
-                            overall_score: float) -> Dict[str, Any]:
+                            overall_score: float,
+                            skipped_files: Optional[List[str]] = None) -> Dict[str, Any]:
         """Generate comprehensive report"""
         
         report = {
@@ -29,6 +30,7 @@ class ReportGenerator:
             'issues': self._generate_issues_report(total_issues),
             'metrics': total_metrics,
             'recommendations': self._generate_recommendations(total_issues, overall_score),
+            'skipped': self._generate_skipped_report(file_analyses, skipped_files or []),
             'generated_at': datetime.now().isoformat()
         }
         
@@ -91,11 +93,24 @@ class ReportGenerator:
                 'total_issues': len(issues),
                 'issues_by_severity': severity_counts,
                 'metrics': metrics,
-                'quality_rating': self._get_quality_rating(score)
+                'quality_rating': self._get_quality_rating(score),
+                'timed_out_analyzers': analysis.get('timed_out', [])
             }
         
         return file_reports
     
+    def _generate_skipped_report(self, file_analyses: Dict[str, Any], 
+                                 skipped_files: List[str]) -> Dict[str, Any]:
+        """Generate the list of work skipped to meet the deadline"""
+        return {
+            'files': list(skipped_files),
+            'analyzers': {
+                file_path: analysis['skipped']
+                for file_path, analysis in file_analyses.items()
+                if analysis.get('skipped')
+            }
+        }
+    
     def _generate_issues_report(self, total_issues: List[Issue]) -> List[Dict[str, Any]]:
         """Generate detailed issues report"""
         issues_report = []
@@ -104,6 +119,7 @@ class ReportGenerator:
             issues_report.append({
                 'file_path': issue.file_path,
                 'line_number': issue.line_number,
+                'end_line_number': issue.end_line_number,
                 'column_number': issue.column_number,
                 'severity': issue.severity.value,
                 'issue_type': issue.issue_type.value,
@@ -246,7 +262,10 @@ class ReportGenerator:
         for file_path, analysis in report['file_analyses'].items():
             md += f"### {file_path}\n\n"
             md += f"- **Score**: {analysis['score']}/100 ({analysis['quality_rating']})\n"
-            md += f"- **Issues**: {analysis['total_issues']}\n\n"
+            md += f"- **Issues**: {analysis['total_issues']}\n"
+            if analysis.get('timed_out_analyzers'):
+                md += f"- **Timed Out**: {', '.join(analysis['timed_out_analyzers'])}\n"
+            md += "\n"
             
             if analysis['issues_by_severity']:
                 md += f"**Issues by Severity**:\n"
@@ -254,6 +273,16 @@ class ReportGenerator:
                     md += f"- {severity.capitalize()}: {count}\n"
                 md += "\n"
         
+        # Work skipped to meet the deadline
+        skipped = report.get('skipped', {})
+        if skipped.get('files') or skipped.get('analyzers'):
+            md += "## Skipped for Time\n\n"
+            for file_path in skipped.get('files', []):
+                md += f"- {file_path}: not analyzed\n"
+            for file_path, stages in skipped.get('analyzers', {}).items():
+                md += f"- {file_path}: {', '.join(stages)}\n"
+            md += "\n"
+        
         # Recommendations
         md += f"## Recommendations\n\n"
         for i, rec in enumerate(report['recommendations'], 1):
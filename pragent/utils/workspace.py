@@ -0,0 +1,30 @@
+"""
+Per-PR scratch workspaces for tools that need files on disk
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+
+# RAM-backed filesystems preferred for scratch files, in order
+RAM_DIRECTORIES = ('/dev/shm',)
+
+
+def _ram_directory() -> Optional[str]:
+    """Find a writable RAM-backed directory, if the platform has one"""
+    for directory in RAM_DIRECTORIES:
+        if os.path.isdir(directory) and os.access(directory, os.W_OK):
+            return directory
+    return None
+
+
+def create_workspace(prefix: str = 'pragent-') -> str:
+    """Create a scratch directory for one PR, in RAM where available"""
+    return tempfile.mkdtemp(prefix=prefix, dir=_ram_directory())
+
+
+def remove_workspace(workspace: str) -> None:
+    """Remove a scratch directory and everything left in it"""
+    shutil.rmtree(workspace, ignore_errors=True)